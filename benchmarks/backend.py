@@ -0,0 +1,45 @@
+"""
+Synthetic stdio MCP server used by the benchmarks, modeled on `examples/tools/calculator.py`.
+Serves `--tools` add tools and a `<name>://items/{item_id}` resource template,
+every response is delayed by `--latency` seconds and padded to `--payload` bytes.
+"""
+
+import argparse
+import asyncio
+
+from mcp.server.fastmcp import FastMCP
+
+
+def make_server(name: str, tools: int, latency: float, payload: int) -> FastMCP:
+    mcp = FastMCP(name)
+    padding = "x" * payload
+
+    def make_add(index: int):
+        async def add(a: int, b: int) -> str:
+            """Add two numbers"""
+            if latency > 0:
+                await asyncio.sleep(latency)
+            result = str(a + b + index)
+            return result + padding[len(result):]
+        return add
+
+    for index in range(tools):
+        mcp.add_tool(make_add(index), name=f"add_{index}")
+
+    @mcp.resource(f"{name}://items/{{item_id}}")
+    async def get_item(item_id: str) -> str:
+        """Get an item"""
+        if latency > 0:
+            await asyncio.sleep(latency)
+        return item_id + padding[len(item_id):]
+
+    return mcp
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--name", default="bench")
+    parser.add_argument("--tools", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--payload", type=int, default=0)
+    args = parser.parse_args()
+    make_server(args.name, args.tools, args.latency, args.payload).run()
@@ -0,0 +1,116 @@
+"""
+Measures the per-request overhead of resolving the request context:
+the former starlette_context middleware with its plugins and `context.get` hooks,
+against the singletons and namespace context variable of `src/context.py`.
+
+    python benchmarks/context.py --requests 20000
+
+The former path needs `starlette-context`, which is no longer a dependency of the proxy.
+"""
+
+import argparse
+import asyncio
+import re
+import sys
+import time
+from pathlib import Path
+
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from src import context
+from src.client import ClientManager
+from src.settings import Settings
+
+
+# a proxy handler resolves the hooks a few times, e.g. `use_namespace` and `use_client_manager` per step
+HOOK_CALLS = 4
+
+def starlette_context_app(settings: Settings, client_manager: ClientManager) -> Starlette:
+    from starlette.middleware import Middleware
+    from starlette_context import context as plugin_context
+    from starlette_context.middleware import ContextMiddleware
+    from starlette_context.plugins import Plugin
+
+    class ClientManagerPlugin(Plugin):
+        key = "client_manager"
+        async def process_request(self, request):
+            return client_manager
+
+    class SettingsPlugin(Plugin):
+        key = "settings"
+        async def process_request(self, request):
+            return settings
+
+    class NamespacePlugin(Plugin):
+        key = "namespace"
+        async def process_request(self, request):
+            path = request.scope.get("path")
+            if path is None or path in ["/sse", "/mcp", "/sse/", "/mcp/"]:
+                return None
+            match = re.match(r"^/([^/]+)/(sse|mcp)/?$", path)
+            return match.group(1) if match else None
+
+    async def endpoint(request):
+        for _ in range(HOOK_CALLS):
+            plugin_context.get("namespace")
+            assert type(plugin_context.get("client_manager")) is ClientManager
+            assert type(plugin_context.get("settings")) is Settings
+        return Response()
+
+    return Starlette(
+        middleware=[Middleware(ContextMiddleware, plugins=[SettingsPlugin(), ClientManagerPlugin(), NamespacePlugin()])],
+        routes=[Route("/{name}/mcp", endpoint=endpoint)],
+    )
+
+def contextvars_app() -> Starlette:
+    async def endpoint(request):
+        with context.bind_namespace(request.path_params["name"]):
+            for _ in range(HOOK_CALLS):
+                context.namespace.get()
+                context.get_client_manager()
+                context.get_settings()
+        return Response()
+
+    return Starlette(routes=[Route("/{name}/mcp", endpoint=endpoint)])
+
+async def measure(app: Starlette, requests: int) -> float:
+    """Returns the seconds per request of calling the app directly, without any network."""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    def scope():
+        return {"type": "http", "method": "GET", "path": "/calculator/mcp", "raw_path": b"/calculator/mcp",
+                "query_string": b"", "headers": [], "root_path": "", "scheme": "http", "server": ("127.0.0.1", 80)}
+
+    for _ in range(requests // 10):
+        await app(scope(), receive, send)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await app(scope(), receive, send)
+    return (time.perf_counter() - start) / requests
+
+async def main(requests: int):
+    settings = Settings()
+    client_manager = ClientManager(settings, [])
+    context.bind(settings, client_manager)
+
+    current = await measure(contextvars_app(), requests)
+    print(f"contextvars:       {current * 1e6:8.2f} us/request")
+    try:
+        former = await measure(starlette_context_app(settings, client_manager), requests)
+    except ImportError:
+        print("starlette_context: not installed, skipped")
+        return
+    print(f"starlette_context: {former * 1e6:8.2f} us/request")
+    print(f"saved:             {(former - current) * 1e6:8.2f} us/request ({1 - current / former:.0%})")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    asyncio.run(main(parser.parse_args().requests))
@@ -0,0 +1,287 @@
+"""
+Benchmarks the proxy against synthetic backends started from `benchmarks/backend.py`.
+For every transport, operation and concurrency level, reports the throughput,
+p50/p99 latency and the resident memory of the proxy process.
+
+    python benchmarks/run.py --backends 4 --concurrency 1 8 32
+    python benchmarks/run.py --output baseline.json
+    python benchmarks/run.py --baseline baseline.json  # exits with 1 on regressions
+
+The `direct` transport talks to a single backend without the proxy, as a baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+from mcp.client.streamable_http import streamablehttp_client
+
+
+ROOT = Path(__file__).resolve().parent.parent
+BACKEND_SCRIPT = Path(__file__).resolve().parent / "backend.py"
+TRANSPORTS = ("sse", "http", "stdio", "direct")
+OPERATIONS = ("list", "call", "read")
+READY_TIMEOUT = 60
+
+@dataclass
+class Result:
+    transport: str
+    operation: str
+    concurrency: int
+    requests: int
+    errors: int
+    throughput: float
+    p50: float
+    p99: float
+    rss: int | None
+
+    @property
+    def key(self) -> tuple[str, str, int]:
+        return self.transport, self.operation, self.concurrency
+
+def backend_args(args: argparse.Namespace, name: str) -> list[str]:
+    return [str(BACKEND_SCRIPT), "--name", name, "--tools", str(args.tools),
+            "--latency", str(args.latency), "--payload", str(args.payload)]
+
+def write_config(path: Path, args: argparse.Namespace):
+    servers = {f"bench{i}": {"command": sys.executable, "args": backend_args(args, f"bench{i}")}
+               for i in range(args.backends)}
+    path.write_text(json.dumps({"mcpServers": servers}, indent=2))
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if len(sorted_values) == 0:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+def rss_bytes(pid: int | None) -> int | None:
+    """Resident memory of the process, only available on Linux."""
+    if pid is None:
+        return None
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+def find_child(marker: str) -> int | None:
+    """Pid of the child process of this one whose command line contains `marker`."""
+    for entry in Path("/proc").glob("[0-9]*"):
+        try:
+            ppid = int((entry / "stat").read_text().rsplit(")", 1)[1].split()[1])
+            cmdline = (entry / "cmdline").read_bytes().replace(b"\0", b" ").decode()
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == os.getpid() and marker in cmdline:
+            return int(entry.name)
+    return None
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+async def wait_for_port(port: int, process: subprocess.Popen):
+    deadline = time.monotonic() + READY_TIMEOUT
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Proxy exited with code {process.returncode}")
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise TimeoutError("Proxy did not start listening")
+
+def proxy_env(transport: str, config_path: Path) -> dict[str, str]:
+    env = {**os.environ, "CONFIG": str(config_path), "TRANSPORT": transport}
+    env.pop("AUTH_TOKEN", None)
+    return env
+
+@asynccontextmanager
+async def open_sessions(transport: str, count: int, config_path: Path, log_path: Path, args: argparse.Namespace):
+    """
+    Yields `count` initialized sessions and the pid of the proxy.
+    The network transports get a connection per session,
+    the stdio ones share a single session as a stdio server only serves one client.
+    """
+    async with AsyncExitStack() as stack:
+        log = stack.enter_context(open(log_path, "w"))
+        pid = None
+
+        if transport in ("sse", "http"):
+            port = free_port()
+            process = subprocess.Popen(
+                [sys.executable, "-m", "hypercorn", "src.main:app", "--bind", f"127.0.0.1:{port}", "--workers", "0"],
+                cwd=ROOT, env=proxy_env(transport, config_path), stdout=log, stderr=log)
+            stack.callback(process.wait)
+            stack.callback(process.terminate)
+            await wait_for_port(port, process)
+            pid = process.pid
+
+            sessions = []
+            for _ in range(count):
+                if transport == "sse":
+                    read, write = await stack.enter_async_context(sse_client(f"http://127.0.0.1:{port}/sse"))
+                else:
+                    read, write, _ = await stack.enter_async_context(streamablehttp_client(f"http://127.0.0.1:{port}/mcp/"))
+                session = await stack.enter_async_context(ClientSession(read, write))
+                await session.initialize()
+                sessions.append(session)
+            yield sessions, pid
+            return
+
+        if transport == "stdio":
+            params = StdioServerParameters(command=sys.executable, args=["-m", "src.main"],
+                                           env=proxy_env(transport, config_path), cwd=ROOT)
+        else:
+            params = StdioServerParameters(command=sys.executable, args=backend_args(args, "bench0"))
+        read, write = await stack.enter_async_context(stdio_client(params, errlog=log))
+        session = await stack.enter_async_context(ClientSession(read, write))
+        await session.initialize()
+        pid = find_child("src.main" if transport == "stdio" else str(BACKEND_SCRIPT))
+        yield [session] * count, pid
+
+async def wait_ready(session: ClientSession, expected_tools: int) -> list[str]:
+    """Waits until every backend has joined the proxy and returns the tool names."""
+    deadline = time.monotonic() + READY_TIMEOUT
+    while True:
+        tools = [tool.name for tool in (await session.list_tools()).tools]
+        if len(tools) >= expected_tools:
+            return tools
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Only {len(tools)} of {expected_tools} tools are available")
+        await asyncio.sleep(0.2)
+
+async def request(session: ClientSession, operation: str, tools: list[str], backends: int):
+    match operation:
+        case "list":
+            await session.list_tools()
+        case "call":
+            result = await session.call_tool(random.choice(tools), {"a": 1, "b": 2})
+            if result.isError:
+                raise RuntimeError(result.content)
+        case "read":
+            await session.read_resource(f"bench{random.randrange(backends)}://items/{random.randrange(1000)}")
+
+async def run_load(
+    sessions: list[ClientSession],
+    operation: str,
+    duration: float,
+    tools: list[str],
+    backends: int,
+) -> tuple[list[float], int, float]:
+    latencies: list[float] = []
+    errors = 0
+    start = time.perf_counter()
+    deadline = start + duration
+
+    async def worker(session: ClientSession):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            sent_at = time.perf_counter()
+            try:
+                await request(session, operation, tools, backends)
+                latencies.append(time.perf_counter() - sent_at)
+            except Exception:
+                errors += 1
+
+    await asyncio.gather(*(worker(session) for session in sessions))
+    return latencies, errors, time.perf_counter() - start
+
+async def bench_transport(transport: str, args: argparse.Namespace, workdir: Path) -> list[Result]:
+    backends = 1 if transport == "direct" else args.backends
+    config_path = workdir / "mcp.json"
+    log_path = workdir / f"{transport}.log"
+    results = []
+    try:
+        async with open_sessions(transport, max(args.concurrency), config_path, log_path, args) as (sessions, pid):
+            tools = await wait_ready(sessions[0], backends * args.tools)
+            for operation in args.operations:
+                for concurrency in args.concurrency:
+                    if args.warmup > 0:
+                        await run_load(sessions[:concurrency], operation, args.warmup, tools, backends)
+                    latencies, errors, elapsed = await run_load(
+                        sessions[:concurrency], operation, args.duration, tools, backends)
+                    latencies.sort()
+                    result = Result(transport, operation, concurrency, len(latencies), errors,
+                                    len(latencies) / elapsed, percentile(latencies, 0.5),
+                                    percentile(latencies, 0.99), rss_bytes(pid))
+                    print_result(result)
+                    results.append(result)
+    except Exception as e:
+        print(f"{transport}: benchmark failed: {e!r}, see the proxy log below", file=sys.stderr)
+        if log_path.exists():
+            print("".join(log_path.read_text().splitlines(keepends=True)[-20:]), file=sys.stderr)
+    return results
+
+HEADER = f"{'transport':<10}{'operation':<10}{'conc':>6}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'rss MB':>10}"
+
+def print_result(result: Result):
+    rss = "-" if result.rss is None else f"{result.rss / 2 ** 20:.1f}"
+    print(f"{result.transport:<10}{result.operation:<10}{result.concurrency:>6}{result.requests:>10}{result.errors:>8}"
+          f"{result.throughput:>10.1f}{result.p50 * 1000:>10.2f}{result.p99 * 1000:>10.2f}{rss:>10}", flush=True)
+
+def compare(results: list[Result], baseline_path: str, tolerance: float) -> bool:
+    """Prints the results that regressed against the baseline, returns whether there are any."""
+    baseline = {Result(**item).key: Result(**item) for item in json.loads(Path(baseline_path).read_text())}
+    regressed = False
+    for result in results:
+        before = baseline.get(result.key)
+        if before is None:
+            continue
+        reasons = []
+        if result.throughput < before.throughput * (1 - tolerance):
+            reasons.append(f"throughput {before.throughput:.1f} -> {result.throughput:.1f} req/s")
+        if result.p99 > before.p99 * (1 + tolerance):
+            reasons.append(f"p99 {before.p99 * 1000:.2f} -> {result.p99 * 1000:.2f} ms")
+        if reasons:
+            regressed = True
+            print(f"REGRESSION {result.transport} {result.operation} x{result.concurrency}: {', '.join(reasons)}")
+    return regressed
+
+async def main(args: argparse.Namespace) -> int:
+    with tempfile.TemporaryDirectory(prefix="multi-mcp-bench-") as workdir:
+        write_config(Path(workdir) / "mcp.json", args)
+        print(HEADER)
+        results = []
+        for transport in args.transports:
+            results.extend(await bench_transport(transport, args, Path(workdir)))
+
+    if args.output is not None:
+        Path(args.output).write_text(json.dumps([asdict(result) for result in results], indent=2))
+    if args.baseline is not None and compare(results, args.baseline, args.tolerance):
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", type=int, default=4, help="number of synthetic backends")
+    parser.add_argument("--tools", type=int, default=8, help="tools per backend")
+    parser.add_argument("--latency", type=float, default=0, help="seconds every backend response is delayed")
+    parser.add_argument("--payload", type=int, default=64, help="bytes of every tool result and resource")
+    parser.add_argument("--transports", nargs="+", choices=TRANSPORTS, default=["sse", "http", "stdio"])
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--duration", type=float, default=5, help="seconds of load per operation and concurrency")
+    parser.add_argument("--warmup", type=float, default=1, help="seconds of load discarded before measuring")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="compare against results written with --output")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="relative slowdown reported as a regression")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,61 @@
+import time
+from typing import Literal
+
+from mcp import types
+
+
+CatalogKind = Literal["tools", "prompts", "resources", "resource_templates"]
+ALL_KINDS: tuple[CatalogKind, ...] = ("tools", "prompts", "resources", "resource_templates")
+CatalogItem = types.Tool | types.Prompt | types.Resource | types.ResourceTemplate
+# the items of a page and the cursor of the next one
+CatalogPage = tuple[list, str | None]
+
+class Catalog:
+    """
+    Per-backend cache of the `*/list` result pages, keyed by their cursor.
+    Entries live until the backend sends a `notifications/*/list_changed`
+    or, if a ttl is configured, until they expire.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self._ttl = ttl
+        self._entries: dict[tuple[str, CatalogKind], dict[str | None, tuple[float, CatalogPage]]] = {}
+        # bumped on every invalidation, used to drop fills that raced with one
+        self._generations: dict[tuple[str, CatalogKind], int] = {}
+        # bumped on every change of any backend's list of a kind, used by derived indexes
+        self._versions: dict[CatalogKind, int] = {}
+
+    def get(self, name: str, kind: CatalogKind, cursor: str | None = None) -> CatalogPage | None:
+        pages = self._entries.get((name, kind))
+        entry = None if pages is None else pages.get(cursor)
+        if entry is None:
+            return None
+        filled_at, page = entry
+        if self._ttl is not None and time.monotonic() - filled_at > self._ttl:
+            del pages[cursor]
+            self._bump(kind)
+            return None
+        return page
+
+    def version(self, kind: CatalogKind) -> int:
+        return self._versions.get(kind, 0)
+
+    def _bump(self, kind: CatalogKind):
+        self._versions[kind] = self.version(kind) + 1
+
+    def generation(self, name: str, kind: CatalogKind) -> int:
+        return self._generations.get((name, kind), 0)
+
+    def put(self, name: str, kind: CatalogKind, cursor: str | None, page: CatalogPage, generation: int):
+        if self.generation(name, kind) != generation:
+            # invalidated while the list request was in flight
+            return
+        self._entries.setdefault((name, kind), {})[cursor] = (time.monotonic(), page)
+        self._bump(kind)
+
+    def invalidate(self, name: str, *kinds: CatalogKind):
+        for kind in kinds or ALL_KINDS:
+            key = (name, kind)
+            self._entries.pop(key, None)
+            self._generations[key] = self._generations.get(key, 0) + 1
+            self._bump(kind)
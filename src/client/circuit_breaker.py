@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+from loguru import logger
+
+from ..metrics import BACKEND_CIRCUIT_OPEN
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures of a client.
+    While open, the client is skipped by the fan-out requests,
+    after `recovery_timeout` seconds it is tried again (half-open).
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self._name = name
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        # set while open, wakes up the health checks of the client
+        self.tripped = asyncio.Event()
+
+    @property
+    def is_open(self) -> bool:
+        if self._opened_at is None:
+            return False
+        return time.monotonic() - self._opened_at < self._recovery_timeout
+
+    def record_success(self):
+        if self._opened_at is not None:
+            logger.info("Circuit of client '{}' closed.", self._name)
+            BACKEND_CIRCUIT_OPEN.set(self._name, value=0)
+        self._failures = 0
+        self._opened_at = None
+        self.tripped.clear()
+
+    def record_failure(self):
+        self._failures += 1
+        if self._failures < self._failure_threshold:
+            return
+        if self._opened_at is None:
+            logger.warning("Circuit of client '{}' opened after {} consecutive failures.", self._name, self._failures)
+            BACKEND_CIRCUIT_OPEN.set(self._name, value=1)
+        self._opened_at = time.monotonic()
+        self.tripped.set()
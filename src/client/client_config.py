@@ -1,10 +1,12 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field, replace
 from typing import Literal
 
 from loguru import logger
 from pydantic import BaseModel
 from pydantic import BaseModel, Field, model_validator
 
+from .session_pool import MCP_METHODS
+
 class MCPServer(BaseModel):
     type: Literal["stdio", "sse", "http"] | None = None
     disabled: bool = False
@@ -13,6 +15,29 @@ class MCPServer(BaseModel):
     headers: dict[str, str] = Field(default_factory=dict)
     args: list[str] = Field(default_factory=list)
     env: dict[str, str] = Field(default_factory=dict)
+    connect_timeout: float | None = None
+    # number of sessions opened to this server, each with its own process for a stdio server
+    replicas: int = Field(default=1, ge=1)
+    # cache the contents of the resources read from this server
+    cache_resources: bool = False
+    resource_cache_ttl: float | None = None
+    # tools of this server whose results are cached, only suited to tools whose results depend on their arguments only
+    cache_tools: list[str] = Field(default_factory=list)
+    tool_cache_ttl: float | None = None
+    # concurrent tool calls sent to this server, over all its replicas
+    max_concurrency: int | None = Field(default=None, ge=1)
+    # tool calls waiting for a free slot, further calls are rejected
+    queue_depth: int = Field(default=100, ge=0)
+    # seconds this server may take to answer a request, overrides `request_timeout` of the settings
+    request_timeout: float | None = None
+    # seconds per MCP method, e.g. `tools/call`, override `request_timeout`
+    method_timeouts: dict[str, float] = Field(default_factory=dict)
+    # send `notifications/cancelled` for the requests timed out or abandoned by their caller
+    cancel_requests: bool = False
+    # talk HTTP/2 to this sse or http server, overrides `http2` of the settings
+    http2: bool | None = None
+    # seconds to wait for the next event of this server, overrides `http_read_timeout` of the settings
+    http_read_timeout: float | None = None
 
     @model_validator(mode="after")
     def check_command_or_url(self) -> "MCPServer":
@@ -36,6 +61,19 @@ class MCPServer(BaseModel):
                 self.type = "http"
         return self
 
+    @model_validator(mode="after")
+    def check_method_timeouts(self) -> "MCPServer":
+        unknown = set(self.method_timeouts) - set(MCP_METHODS.values())
+        if len(unknown) > 0:
+            raise ValueError(f"Unknown methods in 'method_timeouts': {', '.join(sorted(unknown))}.")
+        return self
+
+    @model_validator(mode="after")
+    def check_http_options(self) -> "MCPServer":
+        if (self.http2 is not None or self.http_read_timeout is not None) and self.type == "stdio":
+            raise ValueError("'http2' and 'http_read_timeout' are only supported for 'type':'sse' and 'type':'http'.")
+        return self
+
 @dataclass
 class ClientConfig:
     @dataclass
@@ -51,10 +89,27 @@ class ClientConfig:
     class StreamableParams:
         url: str
         headers: dict[str, str]
+    @dataclass
+    class SupervisorParams:
+        # Unix socket of the supervisor which owns the session of the client
+        socket: str
 
     name: str
-    params: StdioParams | SseParams | StreamableParams
+    params: StdioParams | SseParams | StreamableParams | SupervisorParams
     disabled: bool
+    connect_timeout: float | None = None
+    replicas: int = 1
+    cache_resources: bool = False
+    resource_cache_ttl: float | None = None
+    cache_tools: list[str] = field(default_factory=list)
+    tool_cache_ttl: float | None = None
+    max_concurrency: int | None = None
+    queue_depth: int = 100
+    request_timeout: float | None = None
+    method_timeouts: dict[str, float] = field(default_factory=dict)
+    cancel_requests: bool = False
+    http2: bool | None = None
+    http_read_timeout: float | None = None
 
 def config_parser(raw: dict) -> list[ClientConfig]:
     servers = raw.get("mcpServers")
@@ -68,7 +123,7 @@ def config_parser(raw: dict) -> list[ClientConfig]:
         try:
             validated = MCPServer(**server)
         except ValueError as e:
-            msg: str = e.args[0]
+            msg = str(e)
             logger.error("Failed to parse server config for {}: {}", name, msg)
             continue
 
@@ -95,6 +150,30 @@ def config_parser(raw: dict) -> list[ClientConfig]:
         clients[name] = ClientConfig(
             name=name,
             params=config,
-            disabled=validated.disabled)
+            disabled=validated.disabled,
+            connect_timeout=validated.connect_timeout,
+            replicas=validated.replicas,
+            cache_resources=validated.cache_resources,
+            resource_cache_ttl=validated.resource_cache_ttl,
+            cache_tools=validated.cache_tools,
+            tool_cache_ttl=validated.tool_cache_ttl,
+            max_concurrency=validated.max_concurrency,
+            queue_depth=validated.queue_depth,
+            request_timeout=validated.request_timeout,
+            method_timeouts=validated.method_timeouts,
+            cancel_requests=validated.cancel_requests,
+            http2=validated.http2,
+            http_read_timeout=validated.http_read_timeout)
 
     return list(clients.values())
+
+def through_supervisor(client_configs: list[ClientConfig], socket: str) -> list[ClientConfig]:
+    """
+    Replaces the transports of the clients by the supervisor listening on `socket`,
+    which runs their sessions, caches their resources and tool results, limits their concurrency
+    and cancels their requests once for all the workers.
+    """
+    # the supervisor, an SDK 1.9 server, does not survive `notifications/cancelled`
+    return [replace(config, params=ClientConfig.SupervisorParams(socket), replicas=1, cache_resources=False,
+                    cache_tools=[], max_concurrency=None, cancel_requests=False)
+            for config in client_configs]
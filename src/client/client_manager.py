@@ -1,101 +1,776 @@
+import anyio
+import asyncio
+import httpx
 import os
 
 from contextlib import AsyncExitStack
-from typing import Iterable
+from typing import Any, Callable, Hashable
+from urllib.parse import quote
+from anyio.lowlevel import checkpoint
+from mcp import McpError, types
 from mcp.client.stdio import StdioServerParameters, stdio_client
-from mcp.client.sse import sse_client
-from mcp.client.streamable_http import streamablehttp_client
 from mcp.client.session import ClientSession
 from loguru import logger
+from pydantic import AnyUrl
 
+from .catalog import ALL_KINDS, Catalog, CatalogKind, CatalogPage
+from .circuit_breaker import CircuitBreaker
 from .client_config import ClientConfig
+from .http_pool import HttpPool
+from .limiter import FairLimiter
+from .resource_cache import ResourceCache
+from .resource_index import ResourceIndex
+from .session_pool import CONNECTION_CLOSED, SessionPool
+from .tool_cache import ToolResultCache, tool_cache_key
+from .tool_index import ToolIndex
+from .tool_search import ToolSearchIndex
+from .transports import HTTP_TIMEOUT, sse_client_over, streamablehttp_client_over
+from ..metrics import BACKEND_CIRCUIT_OPEN, BACKEND_SESSIONS, BACKEND_TOOL_CACHE_LOOKUPS
+from ..settings import Settings
 
 
 class ClientManager:
-    def __init__(self, encoding: str, client_configs: list[ClientConfig]):
-        self._encoding = encoding
+    def __init__(self, settings: Settings, client_configs: list[ClientConfig]):
+        self._encoding = settings.encoding
+        self._connect_timeout = settings.connect_timeout
+        self._startup_timeout = settings.startup_timeout
+        self._health_check_interval = settings.health_check_interval
+        self._health_check_timeout = settings.health_check_timeout
+        self._reconnect_initial_backoff = settings.reconnect_initial_backoff
+        self._reconnect_max_backoff = settings.reconnect_max_backoff
+        self._circuit_failure_threshold = settings.circuit_failure_threshold
+        self._circuit_recovery_timeout = settings.circuit_recovery_timeout
+        self._drain_timeout = settings.drain_timeout
+        self._request_timeout = settings.request_timeout
         self._client_configs = client_configs
-        self._stack = AsyncExitStack()
-        self._clients: dict[str, ClientSession] = {}
+        self._configs = {config.name: config for config in client_configs}
+        self._clients: dict[str, SessionPool] = {}
+        # pools of removed or changed clients, finishing their requests in flight before they are stopped
+        self._draining: dict[str, SessionPool] = {}
+        self._tasks: dict[str, list[asyncio.Task]] = {}
+        self._stopping: dict[str, asyncio.Event] = {}
+        self._connecting: set[asyncio.Task] = set()
+        self._catalog = Catalog(settings.catalog_ttl)
+        self._tool_index = ToolIndex(settings.catalog_ttl)
+        # rebuilt along with the tool index
+        self._tool_search = ToolSearchIndex()
+        self._resource_index = ResourceIndex(settings.catalog_ttl)
+        self._resource_cache = ResourceCache(settings.resource_cache_size)
+        self._tool_cache = ToolResultCache(settings.tool_cache_size)
+        self._http_pool = HttpPool(settings)
+        # holders of every (client name, uri) subscribed upstream: frontend sessions, or `_CACHE`
+        # to keep a cached resource current, the upstream subscription lasts as long as it has holders
+        self._subscriptions: dict[tuple[str, str], set[Hashable]] = {}
+        # upstream subscribe requests in flight, awaited by all the first holders of their key
+        self._subscribing: dict[tuple[str, str], asyncio.Future] = {}
+        self._subscribe_unsupported: set[str] = set()
+        self._background_tasks: set[asyncio.Task] = set()
+        self._list_changed_listeners: list[Callable[[str, tuple[CatalogKind, ...]], None]] = []
+        self._resource_updated_listeners: list[Callable[[str, list[Hashable]], None]] = []
 
     async def init_clients(self, ):
-        await self._stack.__aenter__() # manually enter the stack once
+        await self._start_clients(self._client_configs)
 
-        for config in self._client_configs:
+    async def _start_clients(self, client_configs: list[ClientConfig]):
+        """
+        Starts the enabled clients concurrently and returns once they are all up,
+        or once `startup_timeout` has passed, the slower clients join when ready.
+        """
+        startups: list[asyncio.Event] = []
+        for config in client_configs:
             name = config.name
-            params = config.params
 
             if config.disabled:
                 logger.info("Client '{}' is disabled and will not be created.", name)
                 continue
 
-            if name in self._clients:
-                logger.warning("Client '{}' already exists and will be overridden.", name)
+            stop = self._stopping[name] = asyncio.Event()
+            tasks = self._tasks[name] = []
+            for replica in range(config.replicas):
+                started = asyncio.Event()
+                task = asyncio.create_task(
+                    self._run_session(config, replica, started, stop), name=f"mcp-client-{name}-{replica}")
+                tasks.append(task)
+                self._connecting.add(task)
+                startups.append(started)
 
+        if len(startups) == 0: return
+        waiters = [asyncio.create_task(started.wait()) for started in startups]
+        _, pending = await asyncio.wait(waiters, timeout=self._startup_timeout)
+        for waiter in pending: waiter.cancel()
+        if len(pending) > 0:
+            logger.info("{} client session(s) are still starting and will join once ready.", len(pending))
+
+    async def _run_session(self, config: ClientConfig, replica: int, started: asyncio.Event, stop: asyncio.Event):
+        """
+        Owns the transport and session of one client replica for their whole lifetime,
+        the contexts must be entered and exited by the same task.
+        The session is recreated with backoff whenever it fails to start or stops responding,
+        until `stop` is set.
+        """
+        name = config.name
+        task = asyncio.current_task()
+        backoff = self._reconnect_initial_backoff
+        while not stop.is_set():
             try:
+                async with AsyncExitStack() as stack:
+                    session = await self._connect(stack, config)
+                    if session is not None:
+                        backoff = self._reconnect_initial_backoff
+                        self._connecting.discard(task) # type: ignore
+                        pool = self._add_session(name, session)
+                        started.set()
+                        if config.replicas > 1:
+                            logger.info("MCP client '{}' replica {}/{} successfully created.", name, replica + 1, config.replicas)
+                        else:
+                            logger.info("MCP client '{}' successfully created.", name)
+                        try:
+                            await self._supervise(name, session, pool, stop)
+                        finally:
+                            self._remove_session(name, session)
+                            _fail_pending_requests(session, f"Connection to client '{name}' closed")
+                            self._connecting.add(task) # type: ignore
+            except Exception as e:
+                logger.error("Client '{}' stopped unexpectedly: {}", name, e)
+
+            started.set()
+            if stop.is_set(): break
+            logger.info("Reconnecting client '{}' in {} seconds.", name, backoff)
+            await _wait_any(backoff, stop)
+            backoff = min(backoff * 2, self._reconnect_max_backoff)
+        self._connecting.discard(task) # type: ignore
+
+    async def _connect(self, stack: AsyncExitStack, config: ClientConfig) -> ClientSession | None:
+        name = config.name
+        params = config.params
+        timeout = config.connect_timeout or self._connect_timeout
+        try:
+            async with asyncio.timeout(timeout):
                 if type(params) is ClientConfig.StdioParams:
-                    session = await self._init_stdio_client(name, params)
+                    session = await self._init_stdio_client(stack, name, params)
                 elif type(params) is ClientConfig.SseParams:
-                    session = await self._init_sse_client(name, params)
+                    session = await self._init_sse_client(stack, config, params)
                 elif type(params) is ClientConfig.StreamableParams:
-                    session = await self._init_streamable_http_client(name, params)
+                    session = await self._init_streamable_http_client(stack, config, params)
+                elif type(params) is ClientConfig.SupervisorParams:
+                    session = await self._init_supervisor_client(stack, name, params)
                 else: raise Exception("Unreachable")
 
                 await session.initialize()
-                logger.info("MCP client '{}' successfully created.", name)
+                return session
+        except TimeoutError:
+            logger.error("Failed to create client {}: not ready within {} seconds", name, timeout)
+        except Exception as e:
+            logger.error("Failed to create client {}: {}", name, e)
+        return None
+
+    async def _supervise(self, name: str, session: ClientSession, pool: SessionPool, stop: asyncio.Event):
+        """
+        Pings the session every `health_check_interval` seconds, or right away when
+        the circuit of the client opens, returns when the session stops responding or `stop` is set.
+        """
+        while True:
+            await _wait_any(self._health_check_interval, stop, pool.breaker.tripped)
+            if stop.is_set(): return
+            try:
+                async with asyncio.timeout(self._health_check_timeout):
+                    await session.send_ping()
             except Exception as e:
-                logger.error("Failed to create client {}: {}", name, e)
-                continue
-            self._clients[name] = session
+                logger.warning("Health check of client '{}' failed: {}", name, repr(e))
+                return
+            pool.breaker.record_success()
+
+    def _add_session(self, name: str, session: ClientSession) -> SessionPool:
+        BACKEND_SESSIONS.inc(name)
+        pool = self._clients.get(name) or self._draining.get(name)
+        if pool is not None:
+            pool.add(session)
+            return pool
+
+        breaker = CircuitBreaker(name, self._circuit_failure_threshold, self._circuit_recovery_timeout)
+        config = self._configs[name]
+        limiter = None
+        if config.max_concurrency is not None:
+            limiter = FairLimiter(name, config.max_concurrency, config.queue_depth)
+        request_timeout = config.request_timeout or self._request_timeout
+        pool = SessionPool(name, breaker, limiter, request_timeout, config.method_timeouts, config.cancel_requests)
+        pool.add(session)
+        self._clients[name] = pool
+        self._sort_clients()
+        self._catalog.invalidate(name)
+        self._list_changed(name, *ALL_KINDS)
+        # the frontend subscriptions outlive the sessions of the client
+        self._resubscribe(name)
+        return pool
+
+    def _sort_clients(self):
+        # keep the configured order, it decides the owner of colliding tool names
+        order = {config.name: i for i, config in enumerate(self._client_configs)}
+        self._clients = dict(sorted(self._clients.items(), key=lambda item: order[item[0]]))
 
-    async def _init_stdio_client(self, name: str, params: ClientConfig.StdioParams) -> ClientSession:
+    def _remove_session(self, name: str, session: ClientSession):
+        pools = self._clients if name in self._clients else self._draining
+        pool = pools.get(name)
+        if pool is None: return
+        # the upstream subscriptions are made through the primary session
+        lost_subscriptions = len(pool) > 0 and pool.primary is session
+        pool.remove(session)
+        BACKEND_SESSIONS.dec(name)
+        if lost_subscriptions:
+            # the cached resources are no longer kept current, until they are read and subscribed again
+            self._resource_cache.evict_client(name)
+            self._drop_holder(name, _CACHE)
+            if len(pool) > 0:
+                self._resubscribe(name)
+        if len(pool) == 0:
+            del pools[name]
+            BACKEND_CIRCUIT_OPEN.set(name, value=0)
+            self._subscribe_unsupported.discard(name)
+            self._resource_index.forget_client(name)
+            self._tool_cache.evict_client(name)
+            self._catalog.invalidate(name)
+            self._list_changed(name, *ALL_KINDS)
+
+    async def _init_stdio_client(self, stack: AsyncExitStack, name: str, params: ClientConfig.StdioParams) -> ClientSession:
         logger.info("Creating stdio client for '{}' with params: {}.", name, params)
         merged_env = os.environ.copy()
         merged_env.update(params.env)
 
-        read, write = await self._stack.enter_async_context(
+        read, write = await stack.enter_async_context(
             stdio_client(StdioServerParameters(
                 command=params.command,
                 args=params.args,
                 env=merged_env,
                 encoding=self._encoding,
             )))
-        session = await self._stack.enter_async_context(
-            ClientSession(read, write))
+        session = await stack.enter_async_context(
+            ClientSession(read, write, message_handler=self._message_handler_factory(name)))
         return session
 
-    async def _init_sse_client(self, name: str, params: ClientConfig.SseParams) -> ClientSession:
+    async def _init_sse_client(self, stack: AsyncExitStack, config: ClientConfig, params: ClientConfig.SseParams) -> ClientSession:
+        name = config.name
         logger.info("Creating SSE client for '{}' with params: {}", name, params)
-        read, write = await self._stack.enter_async_context(
-            sse_client(
+        read, write = await stack.enter_async_context(
+            sse_client_over(
+                self._http_pool.client(config.http2),
                 url=params.url,
                 headers=params.headers,
+                timeout=self._http_timeout(config),
             ))
-        session = await self._stack.enter_async_context(
-            ClientSession(read, write))
+        session = await stack.enter_async_context(
+            ClientSession(read, write, message_handler=self._message_handler_factory(name)))
         return session
 
-    async def _init_streamable_http_client(self, name: str, params: ClientConfig.StreamableParams) -> ClientSession:
+    async def _init_streamable_http_client(self, stack: AsyncExitStack, config: ClientConfig, params: ClientConfig.StreamableParams) -> ClientSession:
+        name = config.name
         logger.info("Creating streamable HTTP client for '{}' with params: {}", name, params)
-        read, write, _ = await self._stack.enter_async_context(
-            streamablehttp_client(
+        read, write = await stack.enter_async_context(
+            streamablehttp_client_over(
+                self._http_pool.client(config.http2),
                 url=params.url,
                 headers=params.headers,
+                timeout=self._http_timeout(config),
             ))
-        session = await self._stack.enter_async_context(
-            ClientSession(read, write))
+        session = await stack.enter_async_context(
+            ClientSession(read, write, message_handler=self._message_handler_factory(name)))
         return session
 
+    def _http_timeout(self, config: ClientConfig) -> httpx.Timeout:
+        timeout = self._http_pool.timeout
+        if config.http_read_timeout is None:
+            return timeout
+        return httpx.Timeout(timeout.connect, read=config.http_read_timeout)
+
+    async def _init_supervisor_client(self, stack: AsyncExitStack, name: str, params: ClientConfig.SupervisorParams) -> ClientSession:
+        logger.info("Creating supervisor client for '{}' with params: {}", name, params)
+        headers = {}
+        if (token := os.environ.get("AUTH_TOKEN")) is not None:
+            headers["Authorization"] = f"Bearer {token}"
+        http_client = await stack.enter_async_context(
+            httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(uds=params.socket), timeout=HTTP_TIMEOUT))
+        # the host is ignored over a Unix socket, the path selects the client in the supervisor
+        read, write = await stack.enter_async_context(
+            streamablehttp_client_over(http_client, f"http://supervisor/{quote(name, safe='')}/mcp/", headers))
+        session = await stack.enter_async_context(
+            ClientSession(read, write, message_handler=self._message_handler_factory(name)))
+        return session
+
+    def on_list_changed(self, listener: Callable[[str, tuple[CatalogKind, ...]], None]):
+        """
+        Calls `listener` with the name of a client and the kinds of its catalog whenever they may have changed:
+        on the list_changed notifications of the client, and when the client joins or leaves.
+        """
+        self._list_changed_listeners.append(listener)
+
+    def _list_changed(self, name: str, *kinds: CatalogKind):
+        for listener in self._list_changed_listeners:
+            listener(name, kinds)
+
+    def _message_handler_factory(self, name: str):
+        async def message_handler(message):
+            if isinstance(message, types.ServerNotification):
+                match message.root:
+                    case types.ToolListChangedNotification():
+                        logger.info("Tool list of client '{}' changed.", name)
+                        self._catalog.invalidate(name, "tools")
+                        self._forget_in_flight(name, "list_tools")
+                        # the cached results may be from tools that changed
+                        self._tool_cache.evict_client(name)
+                        self._list_changed(name, "tools")
+                    case types.PromptListChangedNotification():
+                        logger.info("Prompt list of client '{}' changed.", name)
+                        self._catalog.invalidate(name, "prompts")
+                        self._forget_in_flight(name, "list_prompts")
+                        self._list_changed(name, "prompts")
+                    case types.ResourceListChangedNotification():
+                        logger.info("Resource list of client '{}' changed.", name)
+                        self._catalog.invalidate(name, "resources", "resource_templates")
+                        self._forget_in_flight(name, "list_resources", "list_resource_templates")
+                        self._list_changed(name, "resources", "resource_templates")
+                    case types.ResourceUpdatedNotification(params=params):
+                        uri = str(params.uri)
+                        self._forget_in_flight(name, uri=uri)
+                        if self._resource_cache.evict(uri):
+                            logger.debug("Cached resource '{}' of client '{}' updated.", uri, name)
+                        subscribers = [holder for holder in self._subscriptions.get((name, uri), ()) if holder is not _CACHE]
+                        if len(subscribers) > 0:
+                            for listener in self._resource_updated_listeners:
+                                listener(uri, subscribers)
+                        self._release_subscription(name, uri, _CACHE)
+            await checkpoint()
+        return message_handler
+
+    def _forget_in_flight(self, name: str, *methods: str, uri: str | None = None):
+        pool = self._clients.get(name)
+        if pool is not None:
+            pool.forget_in_flight(*methods, uri=uri)
+
+    async def list_page(self, name: str, kind: CatalogKind, cursor: str | None = None) -> CatalogPage:
+        """Returns the items of the client's list page at `cursor` and the cursor of its next page."""
+        cached = self._catalog.get(name, kind, cursor)
+        if cached is not None:
+            return cached
+
+        session = self._clients.get(name)
+        if session is None:
+            raise ValueError(f"No client found for name: '{name}'")
+
+        generation = self._catalog.generation(name, kind)
+        match kind:
+            case "tools":
+                result = await session.list_tools(cursor)
+                page = result.tools, result.nextCursor
+            case "prompts":
+                result = await session.list_prompts(cursor)
+                page = result.prompts, result.nextCursor
+            case "resources":
+                result = await session.list_resources(cursor)
+                page = result.resources, result.nextCursor
+            case "resource_templates":
+                result = await session.list_resource_templates(cursor)
+                page = result.resourceTemplates, result.nextCursor
+        self._catalog.put(name, kind, cursor, page, generation)
+        return page
+
+    async def _list_cached(self, name: str, kind: CatalogKind) -> list:
+        """Returns the items of all the pages of the client's list."""
+        items, cursor = await self.list_page(name, kind)
+        seen_cursors = set()
+        while cursor is not None and cursor not in seen_cursors:
+            seen_cursors.add(cursor)
+            page_items, cursor = await self.list_page(name, kind, cursor)
+            items = items + page_items
+        return items
+
+    async def list_tools(self, name: str) -> list[types.Tool]:
+        return await self._list_cached(name, "tools")
+
+    async def list_prompts(self, name: str) -> list[types.Prompt]:
+        return await self._list_cached(name, "prompts")
+
+    async def list_resources(self, name: str) -> list[types.Resource]:
+        return await self._list_cached(name, "resources")
+
+    async def list_resource_templates(self, name: str) -> list[types.ResourceTemplate]:
+        return await self._list_cached(name, "resource_templates")
+
+    async def read_resource(self, name: str, uri: AnyUrl, cache: bool = True) -> types.ReadResourceResult:
+        """
+        Reads the resource from the client, through the resource cache if the client opted in and `cache`.
+        Cached resources are kept current by an upstream subscription when the client supports it,
+        otherwise only by their ttl.
+        """
+        pool = self._clients.get(name)
+        if pool is None:
+            raise ValueError(f"No client found for name: '{name}'")
+
+        config = self._configs[name]
+        if not config.cache_resources or not cache:
+            return await pool.read_resource(uri)
+
+        key = str(uri)
+        cached = self._resource_cache.get(key, name)
+        if cached is not None:
+            return types.ReadResourceResult(contents=cached)
+
+        generation = self._resource_cache.generation
+        subscribed = await self._subscribe_for_cache(name, pool, uri)
+        if not subscribed and config.resource_cache_ttl is None:
+            # without update notifications nor ttl, the cached contents would never refresh
+            return await pool.read_resource(uri)
+
+        try:
+            result = await pool.read_resource(uri)
+        except BaseException:
+            if subscribed:
+                self._release_subscription(name, key, _CACHE)
+            raise
+        evicted = self._resource_cache.put(key, name, result.contents, config.resource_cache_ttl, generation)
+        for evicted_name, evicted_uri in evicted:
+            self._release_subscription(evicted_name, evicted_uri, _CACHE)
+        if self._resource_cache.owner(key) != name:
+            # not cached, e.g. too large or updated during the read
+            self._release_subscription(name, key, _CACHE)
+        return result
+
+    async def call_tool(
+        self,
+        name: str,
+        tool_name: str,
+        arguments: dict[str, Any] | None,
+        caller: Hashable = None,
+    ) -> types.CallToolResult:
+        """
+        Calls the tool of the client, through the tool result cache if the client lists the tool in `cache_tools`.
+        Failed calls are not cached.
+        """
+        pool = self._clients.get(name)
+        if pool is None:
+            raise ValueError(f"No client found for name: '{name}'")
+
+        config = self._configs[name]
+        if tool_name not in config.cache_tools:
+            return await pool.call_tool(tool_name, arguments, caller=caller)
+
+        key = tool_cache_key(name, tool_name, arguments)
+        cached = self._tool_cache.get(key)
+        if cached is not None:
+            BACKEND_TOOL_CACHE_LOOKUPS.inc(name, "hit")
+            return cached
+        BACKEND_TOOL_CACHE_LOOKUPS.inc(name, "miss")
+
+        generation = self._tool_cache.generation
+        result = await pool.call_tool(tool_name, arguments, caller=caller)
+        if not result.isError:
+            self._tool_cache.put(key, name, result, config.tool_cache_ttl, generation)
+        return result
+
+    def get_cached_resource(self, uri: AnyUrl) -> types.ReadResourceResult | None:
+        cached = self._resource_cache.get(str(uri))
+        if cached is None:
+            return None
+        return types.ReadResourceResult(contents=cached)
+
+    async def _subscribe_for_cache(self, name: str, pool: SessionPool, uri: AnyUrl) -> bool:
+        key = (name, str(uri))
+        if _CACHE in self._subscriptions.get(key, ()) and key not in self._subscribing:
+            return True
+        # the python SDK never advertises the `subscribe` capability, so try it out instead
+        if name in self._subscribe_unsupported:
+            return False
+        try:
+            await self.subscribe_resource(name, uri, _CACHE)
+        except McpError as e:
+            logger.info("Client '{}' does not support resource subscriptions: {}", name, e.error.message)
+            self._subscribe_unsupported.add(name)
+            return False
+        except Exception as e:
+            logger.warning("Failed to subscribe to resource '{}' of client '{}': {}", uri, name, e)
+            return False
+        return True
+
+    async def subscribe_resource(self, name: str, uri: AnyUrl, holder: Hashable):
+        """
+        Subscribes `holder` to the updates of the resource of the client.
+        Only the first holder of a resource subscribes upstream, the others share its subscription.
+        """
+        pool = self._clients.get(name)
+        if pool is None:
+            raise ValueError(f"No client found for name: '{name}'")
+
+        key = (name, str(uri))
+        subscribing = self._subscribing.get(key)
+        if key not in self._subscriptions and subscribing is None:
+            subscribing = self._subscribing[key] = asyncio.ensure_future(pool.subscribe_resource(uri))
+
+            def subscribed(future: asyncio.Future):
+                self._subscribing.pop(key, None)
+                if not future.cancelled() and future.exception() is None and key not in self._subscriptions:
+                    # every holder left during the subscription
+                    self._spawn(pool.unsubscribe_resource(uri))
+            subscribing.add_done_callback(subscribed)
+
+        # held before the subscription is made, so that it is released if this holder leaves meanwhile
+        holders = self._subscriptions.setdefault(key, set())
+        added = holder not in holders
+        holders.add(holder)
+        if subscribing is None:
+            return
+        try:
+            # shielded, the other holders waiting for the same subscription must not be cancelled with this one
+            await asyncio.shield(subscribing)
+        except BaseException:
+            if added:
+                if subscribing.done() and (subscribing.cancelled() or subscribing.exception() is not None):
+                    # nothing to unsubscribe upstream
+                    self._drop_holder(name, holder, str(uri))
+                else:
+                    self._release_subscription(name, str(uri), holder)
+            raise
+
+    def unsubscribe_resource(self, name: str | None, uri: AnyUrl, holder: Hashable):
+        """
+        Unsubscribes `holder` from the updates of the resource of the client, or of every client if `name` is `None`.
+        The upstream subscription is released along with its last holder.
+        """
+        names = [key[0] for key in self._subscriptions if key[1] == str(uri)] if name is None else [name]
+        for name in names:
+            self._release_subscription(name, str(uri), holder)
+
+    def release_subscriptions(self, holder: Hashable):
+        """Unsubscribes `holder` from all its resources, e.g. when its session is closed."""
+        for name, uri in [key for key, holders in self._subscriptions.items() if holder in holders]:
+            self._release_subscription(name, uri, holder)
+
+    def on_resource_updated(self, listener: Callable[[str, list[Hashable]], None]):
+        """Calls `listener` with the uri and the holders subscribed to it whenever a client updates a resource."""
+        self._resource_updated_listeners.append(listener)
+
+    def _release_subscription(self, name: str, uri: str, holder: Hashable):
+        holders = self._subscriptions.get((name, uri))
+        if holders is None or holder not in holders:
+            return
+        holders.discard(holder)
+        if len(holders) > 0:
+            return
+        del self._subscriptions[(name, uri)]
+        pool = self._clients.get(name)
+        # a subscription in flight is released by its own callback once made
+        if pool is not None and (name, uri) not in self._subscribing:
+            # may be called from the receive loop of the session, do not wait for the response there
+            self._spawn(pool.unsubscribe_resource(AnyUrl(uri)))
+
+    def _drop_holder(self, name: str, holder: Hashable, uri: str | None = None):
+        """Forgets `holder` in the subscriptions of the client, or only of `uri`, without unsubscribing upstream."""
+        for key in [key for key in self._subscriptions if key[0] == name and uri in (None, key[1])]:
+            holders = self._subscriptions[key]
+            holders.discard(holder)
+            if len(holders) == 0:
+                del self._subscriptions[key]
+
+    def _resubscribe(self, name: str):
+        """Subscribes again upstream to the resources of the client which still have holders."""
+        uris = [uri for client_name, uri in self._subscriptions if client_name == name]
+        if len(uris) == 0:
+            return
+
+        async def resubscribe(pool: SessionPool):
+            for uri in uris:
+                try:
+                    await pool.subscribe_resource(AnyUrl(uri))
+                except Exception as e:
+                    logger.warning("Failed to subscribe again to resource '{}' of client '{}': {}", uri, name, e)
+        pool = self._clients.get(name)
+        if pool is not None:
+            self._spawn(resubscribe(pool))
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def find_tool_owner(self, tool_name: str) -> str | None:
+        """
+        Returns the name of the client which provides the tool,
+        only touches the backends when their tool lists are not cached.
+        """
+        if self._tool_index.is_stale(self._catalog.version("tools")):
+            await self._rebuild_tool_index()
+
+        owner = self._tool_index.get(tool_name)
+        if owner is None and self._tool_index.incomplete:
+            # some backends failed to list their tools last time, retry them on miss
+            await self._rebuild_tool_index()
+            owner = self._tool_index.get(tool_name)
+        return owner
+
+    async def _rebuild_tool_index(self):
+        client_names = list(self._clients.keys())
+        tasks = map(self.list_tools, client_names)
+        task_results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        tool_lists = []
+        incomplete = False
+        for name, result in zip(client_names, task_results):
+            if isinstance(result, BaseException):
+                logger.warning("Failed to list tools of client '{}' for tool index: {}", name, result)
+                incomplete = True
+                continue
+            tool_lists.append((name, result))
+
+        version = self._catalog.version("tools")
+        if any(self._catalog.get(name, "tools") is None for name, _ in tool_lists):
+            # a list_changed arrived during the rebuild, rebuild again on next lookup
+            version = None
+        self._tool_index.rebuild(version, tool_lists, incomplete)
+        self._tool_search.rebuild(tool_lists)
+
+    async def search_tools(
+        self,
+        query: str,
+        limit: int,
+        accept: Callable[[str, types.Tool], bool] | None = None,
+    ) -> list[tuple[str, types.Tool]]:
+        """
+        Returns up to `limit` tools accepted by `accept` and matching the keywords of `query`,
+        with the names of their clients, best first.
+        """
+        if self._tool_index.is_stale(self._catalog.version("tools")):
+            await self._rebuild_tool_index()
+        return self._tool_search.search(query, limit, accept)
+
+    async def find_resource_owner(self, uri: AnyUrl) -> str | None:
+        """
+        Returns the name of the client which lists the resource or a matching resource template,
+        or which was found to serve it before.
+        """
+        version = (self._catalog.version("resources"), self._catalog.version("resource_templates"))
+        if self._resource_index.is_stale(version):
+            await self._rebuild_resource_index()
+        return self._resource_index.get(str(uri))
+
+    def learn_resource_owner(self, uri: AnyUrl, name: str):
+        self._resource_index.learn(str(uri), name)
+
+    def forget_resource_owner(self, uri: AnyUrl):
+        self._resource_index.forget(str(uri))
+
+    async def _rebuild_resource_index(self):
+        client_names = list(self._clients.keys())
+        tasks = [self.list_resources(name) for name in client_names] +\
+                [self.list_resource_templates(name) for name in client_names]
+        task_results = await asyncio.gather(*tasks, return_exceptions=True)
+
+        resource_lists = []
+        template_lists = []
+        for i, result in enumerate(task_results):
+            name = client_names[i % len(client_names)]
+            if isinstance(result, BaseException):
+                logger.debug("Failed to list resources of client '{}' for resource index: {}", name, result)
+                continue
+            if i < len(client_names):
+                resource_lists.append((name, result))
+            else:
+                template_lists.append((name, result))
+
+        version = (self._catalog.version("resources"), self._catalog.version("resource_templates"))
+        self._resource_index.rebuild(version, resource_lists, template_lists)
+
+    @property
+    def client_names(self) -> list[str]:
+        """Names of the connected clients, without those whose circuit is open."""
+        return [name for name, pool in self._clients.items() if pool.available]
+
     @property
-    def client_names(self) -> Iterable[str]:
-        return self._clients.keys()
+    def client_sessions(self) -> list[SessionPool]:
+        return [pool for pool in self._clients.values() if pool.available]
 
     @property
-    def client_sessions(self) -> Iterable[ClientSession]:
-        return self._clients.values()
+    def available_clients(self) -> list[tuple[str, SessionPool]]:
+        """Names and pools of the connected clients, without those whose circuit is open, checked once per client."""
+        return [(name, pool) for name, pool in self._clients.items() if pool.available]
 
-    def get_client(self, name: str) -> ClientSession | None:
+    def get_client(self, name: str) -> SessionPool | None:
         return self._clients.get(name)
 
+    async def reload(self, client_configs: list[ClientConfig]) -> tuple[list[str], list[str], list[str]]:
+        """
+        Applies a new list of client configs: removed and changed clients are drained and stopped,
+        then added and changed clients are started, the sessions of unchanged clients are left untouched.
+        Returns the names of the added, changed and removed clients.
+        """
+        configs = {config.name: config for config in client_configs}
+        added = [name for name in configs if name not in self._configs]
+        changed = [name for name in configs if name in self._configs and configs[name] != self._configs[name]]
+        removed = [name for name in self._configs if name not in configs]
+        if len(added) + len(changed) + len(removed) == 0:
+            return added, changed, removed
+
+        logger.info("Reloading clients, added: {}, changed: {}, removed: {}.", added, changed, removed)
+        await asyncio.gather(*(self._stop_client(name) for name in changed + removed))
+        self._client_configs = client_configs
+        self._configs = configs
+        self._sort_clients()
+        await self._start_clients([configs[name] for name in added + changed])
+        return added, changed, removed
+
+    async def _stop_client(self, name: str):
+        """
+        Stops routing new requests to the client, waits up to `drain_timeout` seconds
+        for its requests in flight to finish, then stops its sessions.
+        """
+        pool = self._clients.pop(name, None)
+        if pool is not None:
+            self._draining[name] = pool
+            self._catalog.invalidate(name)
+            self._list_changed(name, *ALL_KINDS)
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self._drain_timeout
+            while pool.in_flight > 0 and loop.time() < deadline:
+                await asyncio.sleep(0.1)
+            if pool.in_flight > 0:
+                logger.warning("Stopping client '{}' with {} request(s) still in flight.", name, pool.in_flight)
+
+        stop = self._stopping.pop(name, None)
+        if stop is not None:
+            stop.set()
+        tasks = self._tasks.pop(name, [])
+        for task in tasks:
+            if task in self._connecting:
+                task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("Client '{}' stopped.", name)
+
     async def close(self) -> None:
-        await self._stack.aclose()
+        for stop in self._stopping.values():
+            stop.set()
+        for task in self._connecting:
+            task.cancel()
+        await asyncio.gather(*(task for tasks in self._tasks.values() for task in tasks), return_exceptions=True)
+        await self._http_pool.aclose()
+
+# the holder of the subscriptions kept for the resource cache
+_CACHE = object()
+
+async def _wait_any(timeout: float | None, *events: asyncio.Event):
+    """Sleeps until one of the events is set or the timeout expires."""
+    waiters = [asyncio.create_task(event.wait()) for event in events]
+    try:
+        await asyncio.wait(waiters, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for waiter in waiters: waiter.cancel()
+
+def _fail_pending_requests(session: ClientSession, reason: str):
+    """
+    The SDK leaves requests waiting forever once their transport is gone,
+    answer them with an error so their callers do not hang.
+    """
+    for request_id, stream in list(session._response_streams.items()):
+        error = types.JSONRPCError(
+            jsonrpc="2.0",
+            id=request_id,
+            error=types.ErrorData(code=CONNECTION_CLOSED, message=reason))
+        try:
+            stream.send_nowait(error)
+        except anyio.WouldBlock:
+            pass
@@ -0,0 +1,52 @@
+from typing import Any
+
+import httpx
+
+from ..metrics import BACKEND_HTTP_CONNECTIONS, BACKEND_HTTP_REQUESTS
+from ..settings import Settings
+
+
+class HttpPool:
+    """
+    The HTTP clients shared by the sessions of all the sse and streamable HTTP servers,
+    one per HTTP version, so that the connections to a host are pooled and reused across its sessions and servers.
+    """
+
+    def __init__(self, settings: Settings):
+        self._limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry)
+        self._http2 = settings.http2
+        self.timeout = httpx.Timeout(settings.http_timeout, read=settings.http_read_timeout)
+        self._clients: dict[bool, httpx.AsyncClient] = {}
+
+    def client(self, http2: bool | None = None) -> httpx.AsyncClient:
+        """The shared client, speaking HTTP/2 if `http2`, or by default if it is `None`."""
+        if http2 is None:
+            http2 = self._http2
+        client = self._clients.get(http2)
+        if client is None:
+            # HTTP/2 requires the `h2` package, which comes with hypercorn
+            client = self._clients[http2] = httpx.AsyncClient(
+                http2=http2,
+                limits=self._limits,
+                timeout=self.timeout,
+                follow_redirects=True,
+                event_hooks={"request": [_count_request]})
+        return client
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+async def _count_request(request: httpx.Request):
+    host = request.url.netloc.decode()
+    BACKEND_HTTP_REQUESTS.inc(host)
+
+    async def trace(event: str, _: dict[str, Any]):
+        # only sent by the requests which could not reuse a pooled connection
+        if event == "connection.connect_tcp.complete":
+            BACKEND_HTTP_CONNECTIONS.inc(host)
+    request.extensions["trace"] = trace
@@ -0,0 +1,108 @@
+import asyncio
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable
+
+from mcp import McpError, types
+
+from ..metrics import BACKEND_QUEUED_REQUESTS, BACKEND_REJECTED_REQUESTS
+
+
+# in the implementation defined range of JSON-RPC server errors, next to CONNECTION_CLOSED
+SERVER_BUSY = -32001
+
+class FairLimiter:
+    """
+    Bounds the concurrent requests sent to a client to `max_concurrency`.
+    The requests over the limit wait in a queue per caller, and the freed slots go
+    to the callers in turn, so a caller with many requests cannot starve the others.
+    Once `queue_depth` requests are waiting, further requests are rejected at once,
+    unless the caller has fewer requests waiting than another one, whose last request is rejected instead.
+    """
+
+    def __init__(self, name: str, max_concurrency: int, queue_depth: int):
+        self._name = name
+        self._max_concurrency = max_concurrency
+        self._queue_depth = queue_depth
+        self._active = 0
+        self._queued = 0
+        # the callers in the order they get the next free slots
+        self._queues: OrderedDict[Hashable, deque[asyncio.Future]] = OrderedDict()
+
+    @asynccontextmanager
+    async def slot(self, caller: Hashable, deadline: float | None = None) -> AsyncIterator[None]:
+        """Waits for a free slot, up to the loop time `deadline`, past which `TimeoutError` is raised."""
+        async with asyncio.timeout_at(deadline):
+            await self._acquire(caller)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, caller: Hashable):
+        if self._active < self._max_concurrency and self._queued == 0:
+            self._active += 1
+            return
+        if self._queued >= self._queue_depth:
+            self._drop_done()
+        if self._queued >= self._queue_depth:
+            # make room by rejecting the last request of the caller with the most waiting ones, if not this caller
+            longest = max(self._queues, key=lambda queued_caller: len(self._queues[queued_caller]), default=None)
+            if longest is None or len(self._queues.get(caller, ())) + 1 >= len(self._queues[longest]):
+                raise self._reject()
+            victim = self._queues[longest][-1]
+            self._dequeue(longest, victim)
+            victim.set_exception(self._reject())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(caller, deque()).append(waiter)
+        self._queued += 1
+        BACKEND_QUEUED_REQUESTS.inc(self._name)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # the slot was handed over right before the cancellation, pass it on
+                self._release()
+            elif waiter in self._queues.get(caller, ()):
+                # not yet skipped by `_release` nor dropped by `_drop_done`
+                self._dequeue(caller, waiter)
+            raise
+
+    def _reject(self) -> McpError:
+        BACKEND_REJECTED_REQUESTS.inc(self._name)
+        return McpError(types.ErrorData(
+            code=SERVER_BUSY,
+            message=f"Client '{self._name}' is busy, {self._queued} request(s) are already waiting"))
+
+    def _dequeue(self, caller: Hashable, waiter: asyncio.Future):
+        queue = self._queues[caller]
+        queue.remove(waiter)
+        if len(queue) == 0:
+            del self._queues[caller]
+        self._queued -= 1
+        BACKEND_QUEUED_REQUESTS.dec(self._name)
+
+    def _drop_done(self):
+        """
+        Dequeues the waiters already cancelled, a waiter is cancelled along with its task
+        but only leaves its queue once the task runs again.
+        """
+        for caller, queue in list(self._queues.items()):
+            for waiter in [waiter for waiter in queue if waiter.done()]:
+                self._dequeue(caller, waiter)
+
+    def _release(self):
+        while len(self._queues) > 0:
+            # hand the slot over to the first waiter of the next caller, which goes to the back of the line
+            caller, queue = next(iter(self._queues.items()))
+            waiter = queue[0]
+            self._dequeue(caller, waiter)
+            if waiter.done():
+                # cancelled, its task has not dequeued it yet
+                continue
+            if caller in self._queues:
+                self._queues.move_to_end(caller)
+            waiter.set_result(None)
+            return
+        self._active -= 1
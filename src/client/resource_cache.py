@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from mcp import types
+
+
+ResourceContents = list[types.TextResourceContents | types.BlobResourceContents]
+
+@dataclass
+class _Entry:
+    client_name: str
+    contents: ResourceContents
+    size: int
+    expires_at: float | None
+
+class ResourceCache:
+    """
+    LRU cache of resource contents keyed by URI,
+    bounded by the total size of the cached texts and blobs.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._size = 0
+        # bumped on every invalidation, used to drop fills that raced with one
+        self._generation = 0
+
+    def get(self, uri: str, client_name: str | None = None) -> ResourceContents | None:
+        entry = self._entries.get(uri)
+        if entry is None:
+            return None
+        if client_name is not None and entry.client_name != client_name:
+            return None
+        if entry.expires_at is not None and time.monotonic() > entry.expires_at:
+            self._pop(uri)
+            return None
+        self._entries.move_to_end(uri)
+        return entry.contents
+
+    def owner(self, uri: str) -> str | None:
+        entry = self._entries.get(uri)
+        return None if entry is None else entry.client_name
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def put(
+        self,
+        uri: str,
+        client_name: str,
+        contents: ResourceContents,
+        ttl: float | None,
+        generation: int,
+    ) -> list[tuple[str, str]]:
+        """Returns the `(client_name, uri)` of the entries evicted to make room."""
+        if generation != self._generation:
+            # invalidated while the read request was in flight
+            return []
+
+        size = sum(len(content.text) if isinstance(content, types.TextResourceContents) else len(content.blob)
+                   for content in contents)
+        if size > self._max_bytes:
+            return []
+
+        evicted = []
+        if uri in self._entries:
+            self._pop(uri)
+        while self._size + size > self._max_bytes:
+            lru_uri, lru_entry = next(iter(self._entries.items()))
+            self._pop(lru_uri)
+            evicted.append((lru_entry.client_name, lru_uri))
+
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[uri] = _Entry(client_name, contents, size, expires_at)
+        self._size += size
+        return evicted
+
+    def evict(self, uri: str) -> bool:
+        self._generation += 1
+        return self._pop(uri) is not None
+
+    def evict_client(self, client_name: str) -> list[str]:
+        self._generation += 1
+        uris = [uri for uri, entry in self._entries.items() if entry.client_name == client_name]
+        for uri in uris: self._pop(uri)
+        return uris
+
+    def _pop(self, uri: str) -> _Entry | None:
+        entry = self._entries.pop(uri, None)
+        if entry is not None:
+            self._size -= entry.size
+        return entry
@@ -0,0 +1,89 @@
+import re
+import time
+from collections import OrderedDict
+from typing import Iterable
+
+from mcp import types
+
+
+LEARNED_OWNERS_SIZE = 1024
+
+def template_to_regex(uri_template: str) -> re.Pattern:
+    """Translates a RFC 6570 URI template into a regex matching its expansions."""
+    pattern = ""
+    position = 0
+    for expression in re.finditer(r"\{([+#./;?&]?)[^}]*\}", uri_template):
+        pattern += re.escape(uri_template[position:expression.start()])
+        match expression.group(1):
+            case "+" | "#": pattern += ".*"
+            case "?" | "&": pattern += r"([?&].*)?"
+            case _: pattern += "[^/?#]+"
+        position = expression.end()
+    pattern += re.escape(uri_template[position:])
+    return re.compile(f"^{pattern}$")
+
+class ResourceIndex:
+    """
+    Maps resource URIs to the name of the client that provides them,
+    derived from the catalog so reads go to a single client.
+    URIs only found by probing the clients are remembered in a bounded LRU.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self._ttl = ttl
+        self._owners: dict[str, str] = {}
+        self._templates: list[tuple[re.Pattern, str]] = []
+        self._learned: OrderedDict[str, str] = OrderedDict()
+        self._version = None
+        self._built_at = 0.0
+
+    def is_stale(self, catalog_version) -> bool:
+        if self._version != catalog_version:
+            return True
+        return self._ttl is not None and time.monotonic() - self._built_at > self._ttl
+
+    def rebuild(
+        self,
+        catalog_version,
+        resource_lists: Iterable[tuple[str, list[types.Resource]]],
+        template_lists: Iterable[tuple[str, list[types.ResourceTemplate]]],
+    ):
+        owners: dict[str, str] = {}
+        for client_name, resources in resource_lists:
+            for resource in resources:
+                owners.setdefault(str(resource.uri), client_name)
+
+        templates = []
+        for client_name, resource_templates in template_lists:
+            for template in resource_templates:
+                templates.append((template_to_regex(template.uriTemplate), client_name))
+
+        self._owners = owners
+        self._templates = templates
+        self._version = catalog_version
+        self._built_at = time.monotonic()
+
+    def get(self, uri: str) -> str | None:
+        owner = self._owners.get(uri)
+        if owner is not None:
+            return owner
+        for regex, client_name in self._templates:
+            if regex.match(uri):
+                return client_name
+        owner = self._learned.get(uri)
+        if owner is not None:
+            self._learned.move_to_end(uri)
+        return owner
+
+    def learn(self, uri: str, client_name: str):
+        self._learned[uri] = client_name
+        self._learned.move_to_end(uri)
+        if len(self._learned) > LEARNED_OWNERS_SIZE:
+            self._learned.popitem(last=False)
+
+    def forget(self, uri: str):
+        self._learned.pop(uri, None)
+
+    def forget_client(self, client_name: str):
+        for uri in [uri for uri, owner in self._learned.items() if owner == client_name]:
+            del self._learned[uri]
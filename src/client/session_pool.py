@@ -0,0 +1,256 @@
+import asyncio
+import contextlib
+import httpx
+import time
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from mcp import ClientSession, McpError, types
+from pydantic import AnyUrl
+
+from .circuit_breaker import CircuitBreaker
+from .limiter import FairLimiter
+from .singleflight import Singleflight
+from ..metrics import BACKEND_COALESCED_REQUESTS, BACKEND_REQUEST_DURATION, BACKEND_REQUESTS, BACKEND_REQUESTS_IN_FLIGHT
+
+
+# same code as newer SDK versions use for requests failed by a closed connection
+CONNECTION_CLOSED = -32000
+
+T = TypeVar("T")
+
+MCP_METHODS = {
+    "call_tool": "tools/call",
+    "get_prompt": "prompts/get",
+    "read_resource": "resources/read",
+    "complete": "completion/complete",
+    "list_tools": "tools/list",
+    "list_prompts": "prompts/list",
+    "list_resources": "resources/list",
+    "list_resource_templates": "resources/templates/list",
+    "subscribe_resource": "resources/subscribe",
+    "unsubscribe_resource": "resources/unsubscribe",
+}
+
+class SessionPool:
+    """
+    The sessions of one configured server, e.g. its replicas, each connected and reconnected on its own.
+    Exposes the `ClientSession` methods used by the proxy:
+    catalog operations are answered by a single session,
+    other requests go to the session with the least outstanding requests.
+    Concurrent identical catalog and resource read requests share a single upstream request.
+    Requests not answered within their timeout fail, and with `cancel_requests`
+    they are cancelled upstream, as are the requests whose caller is cancelled.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        breaker: CircuitBreaker,
+        limiter: FairLimiter | None = None,
+        request_timeout: float | None = None,
+        method_timeouts: dict[str, float] | None = None,
+        cancel_requests: bool = False,
+    ):
+        self.name = name
+        self.breaker = breaker
+        self.limiter = limiter
+        self._request_timeout = request_timeout
+        # keyed by MCP method, e.g. `tools/call`
+        self._method_timeouts = method_timeouts or {}
+        self._cancel_requests = cancel_requests
+        self._sessions: list[ClientSession] = []
+        self._outstanding: dict[ClientSession, int] = {}
+        self._in_flight = 0
+        self._singleflight = Singleflight()
+        self._background_tasks: set[asyncio.Task] = set()
+
+    def add(self, session: ClientSession):
+        self._sessions.append(session)
+        self._outstanding[session] = 0
+
+    def remove(self, session: ClientSession):
+        if session in self._outstanding:
+            self._sessions.remove(session)
+            del self._outstanding[session]
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    @property
+    def sessions(self) -> list[ClientSession]:
+        return self._sessions
+
+    @property
+    def primary(self) -> ClientSession:
+        return self._sessions[0]
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests waiting for a response of any of the sessions."""
+        return self._in_flight
+
+    @property
+    def available(self) -> bool:
+        return not self.breaker.is_open
+
+    def _least_busy(self) -> ClientSession:
+        return min(self._sessions, key=self._outstanding.__getitem__)
+
+    async def _request(self, session: ClientSession, method: str, *args, deadline: float | None = None) -> Any:
+        """Sends the request, bounded by its timeout, or by the loop time `deadline` if given."""
+        mcp_method = MCP_METHODS[method]
+        timeout = self._method_timeouts.get(mcp_method, self._request_timeout)
+        BACKEND_REQUESTS_IN_FLIGHT.inc(self.name)
+        self._in_flight += 1
+        start = time.perf_counter()
+        outcome = "success"
+        # the id the session is about to give to the request, it is taken before the first suspension
+        request_id = session._request_id
+        try:
+            async with asyncio.timeout(timeout) if deadline is None else asyncio.timeout_at(deadline):
+                result = await getattr(session, method)(*args)
+        except TimeoutError:
+            outcome = "timeout"
+            self.breaker.record_failure()
+            self._cancel_upstream(session, request_id, "timeout")
+            raise McpError(types.ErrorData(
+                code=httpx.codes.REQUEST_TIMEOUT,
+                message=f"Client '{self.name}' did not answer {mcp_method} within {timeout} seconds"))
+        except McpError as e:
+            # an error response still proves the backend alive, unless the response never came
+            if e.error.code in (httpx.codes.REQUEST_TIMEOUT, CONNECTION_CLOSED):
+                outcome = "failure"
+                self.breaker.record_failure()
+            else:
+                outcome = "error"
+                self.breaker.record_success()
+            raise
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            self._cancel_upstream(session, request_id, "cancelled by the proxy client")
+            raise
+        except Exception:
+            outcome = "failure"
+            self.breaker.record_failure()
+            raise
+        finally:
+            BACKEND_REQUESTS_IN_FLIGHT.dec(self.name)
+            self._in_flight -= 1
+            BACKEND_REQUESTS.inc(self.name, mcp_method, outcome)
+            BACKEND_REQUEST_DURATION.observe(time.perf_counter() - start, self.name, mcp_method)
+        self.breaker.record_success()
+        return result
+
+    def _cancel_upstream(self, session: ClientSession, request_id: int, reason: str):
+        """Tells the backend to stop working on a request whose response is not awaited anymore."""
+        if not self._cancel_requests:
+            return
+        notification = types.ClientNotification(types.CancelledNotification(
+            method="notifications/cancelled",
+            params=types.CancelledNotificationParams(requestId=request_id, reason=reason)))
+        async def send():
+            # the session may be closed by now, then there is nothing left to cancel
+            with contextlib.suppress(Exception):
+                await session.send_notification(notification)
+
+        # the caller may be cancelled, send it from a task of its own
+        task = asyncio.create_task(send())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _balanced(self, method: str, *args, deadline: float | None = None) -> Any:
+        session = self._least_busy()
+        self._outstanding[session] += 1
+        try:
+            return await self._request(session, method, *args, deadline=deadline)
+        finally:
+            if session in self._outstanding:
+                self._outstanding[session] -= 1
+
+    async def _coalesced(self, call: Callable[[], Awaitable[T]], method: str, *args: Hashable) -> T:
+        key = (method, *args)
+        if key in self._singleflight:
+            BACKEND_COALESCED_REQUESTS.inc(self.name, MCP_METHODS[method])
+        return await self._singleflight.do(key, call)
+
+    def forget_in_flight(self, *methods: str, uri: str | None = None):
+        """
+        Makes later requests of the methods, or reads of the resource, not share the ones in flight,
+        which may answer with the state before a change notification.
+        """
+        self._singleflight.forget(lambda key: key[0] in methods or (uri is not None and key == ("read_resource", uri)))
+
+    ### Balanced requests
+
+    async def call_tool(
+        self,
+        name: str,
+        arguments: dict[str, Any] | None = None,
+        caller: Hashable = None,
+    ) -> types.CallToolResult:
+        """`caller` identifies the frontend client for the fair queueing of the calls over `max_concurrency`."""
+        if self.limiter is None:
+            return await self._balanced("call_tool", name, arguments)
+        # the wait in the queue counts in the timeout of the call
+        timeout = self._method_timeouts.get(MCP_METHODS["call_tool"], self._request_timeout)
+        deadline = None if timeout is None else asyncio.get_running_loop().time() + timeout
+        async with contextlib.AsyncExitStack() as stack:
+            try:
+                await stack.enter_async_context(self.limiter.slot(caller, deadline))
+            except TimeoutError:
+                raise McpError(types.ErrorData(
+                    code=httpx.codes.REQUEST_TIMEOUT,
+                    message=f"Client '{self.name}' had no free slot for tools/call within {timeout} seconds"))
+            return await self._balanced("call_tool", name, arguments, deadline=deadline)
+
+    async def get_prompt(self, name: str, arguments: dict[str, str] | None = None) -> types.GetPromptResult:
+        return await self._balanced("get_prompt", name, arguments)
+
+    async def read_resource(self, uri: AnyUrl) -> types.ReadResourceResult:
+        return await self._coalesced(lambda: self._balanced("read_resource", uri), "read_resource", str(uri))
+
+    async def complete(
+        self,
+        ref: types.ResourceReference | types.PromptReference,
+        argument: dict[str, str],
+    ) -> types.CompleteResult:
+        return await self._balanced("complete", ref, argument)
+
+    ### Catalog requests, answered once for the pool
+
+    async def _list(self, method: str, cursor: str | None) -> Any:
+        return await self._coalesced(lambda: self._request(self.primary, method, cursor), method, cursor)
+
+    async def list_tools(self, cursor: str | None = None) -> types.ListToolsResult:
+        return await self._list("list_tools", cursor)
+
+    async def list_prompts(self, cursor: str | None = None) -> types.ListPromptsResult:
+        return await self._list("list_prompts", cursor)
+
+    async def list_resources(self, cursor: str | None = None) -> types.ListResourcesResult:
+        return await self._list("list_resources", cursor)
+
+    async def list_resource_templates(self, cursor: str | None = None) -> types.ListResourceTemplatesResult:
+        return await self._list("list_resource_templates", cursor)
+
+    async def subscribe_resource(self, uri: AnyUrl) -> types.EmptyResult:
+        return await self._request(self.primary, "subscribe_resource", uri)
+
+    async def unsubscribe_resource(self, uri: AnyUrl) -> types.EmptyResult:
+        return await self._request(self.primary, "unsubscribe_resource", uri)
+
+    ### Broadcast to every session
+
+    async def set_logging_level(self, level: types.LoggingLevel):
+        await asyncio.gather(*(session.set_logging_level(level) for session in self._sessions))
+
+    async def send_progress_notification(
+        self,
+        progress_token: str | int,
+        progress: float,
+        total: float | None = None,
+        message: str | None = None,
+    ):
+        await asyncio.gather(*(
+            session.send_progress_notification(progress_token, progress, total, message)
+            for session in self._sessions))
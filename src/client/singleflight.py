@@ -0,0 +1,52 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+
+T = TypeVar("T")
+
+@dataclass(eq=False)
+class _Flight:
+    task: asyncio.Future
+    waiters: int = field(default=0)
+
+class Singleflight:
+    """
+    Coalesces concurrent calls with the same key into a single in-flight call,
+    whose result or exception is shared by all the callers.
+    A caller being cancelled does not cancel the call for the others,
+    the call is only cancelled once all of its callers are.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._flights
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = self._flights[key] = _Flight(asyncio.ensure_future(call()))
+            flight.task.add_done_callback(lambda _: self._detach(key, flight))
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                self._detach(key, flight)
+                flight.task.cancel()
+
+    def forget(self, match: Callable[[Hashable], bool]):
+        """
+        Makes later calls with the matching keys start a new call,
+        e.g. after the result they would share became stale.
+        """
+        for key in [key for key in self._flights if match(key)]:
+            del self._flights[key]
+
+    def _detach(self, key: Hashable, flight: _Flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
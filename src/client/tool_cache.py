@@ -0,0 +1,79 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from mcp import types
+
+
+def tool_cache_key(client_name: str, tool_name: str, arguments: dict[str, Any] | None) -> str:
+    """Hash of the call, the same for arguments differing only in the order or spacing of their keys."""
+    canonical = json.dumps([client_name, tool_name, arguments or {}],
+                           sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+@dataclass
+class _Entry:
+    client_name: str
+    result: types.CallToolResult
+    size: int
+    expires_at: float | None
+
+class ToolResultCache:
+    """
+    LRU cache of tool call results keyed by `tool_cache_key`,
+    bounded by the total size of the serialized results.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._size = 0
+        # bumped on every invalidation, used to drop fills that raced with one
+        self._generation = 0
+
+    def get(self, key: str) -> types.CallToolResult | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at is not None and time.monotonic() > entry.expires_at:
+            self._pop(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.result
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def put(self, key: str, client_name: str, result: types.CallToolResult, ttl: float | None, generation: int):
+        if generation != self._generation:
+            # invalidated while the call was in flight
+            return
+
+        size = len(result.model_dump_json(by_alias=True, exclude_none=True))
+        if size > self._max_bytes:
+            return
+
+        if key in self._entries:
+            self._pop(key)
+        while self._size + size > self._max_bytes:
+            self._pop(next(iter(self._entries)))
+
+        expires_at = None if ttl is None else time.monotonic() + ttl
+        self._entries[key] = _Entry(client_name, result, size, expires_at)
+        self._size += size
+
+    def evict_client(self, client_name: str) -> int:
+        self._generation += 1
+        keys = [key for key, entry in self._entries.items() if entry.client_name == client_name]
+        for key in keys: self._pop(key)
+        return len(keys)
+
+    def _pop(self, key: str) -> _Entry | None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+        return entry
@@ -0,0 +1,56 @@
+import time
+from typing import Iterable
+
+from loguru import logger
+from mcp import types
+
+
+class ToolIndex:
+    """
+    Maps tool names to the name of the client that provides them,
+    derived from the catalog so non-namespaced calls skip the `tools/list` fan-out.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self._ttl = ttl
+        self._owners: dict[str, str] = {}
+        self._collisions: dict[str, list[str]] = {}
+        self._version: int | None = None
+        self._built_at = 0.0
+        self.incomplete = True
+
+    def is_stale(self, catalog_version: int) -> bool:
+        if self._version != catalog_version:
+            return True
+        return self._ttl is not None and time.monotonic() - self._built_at > self._ttl
+
+    def rebuild(
+        self,
+        catalog_version: int | None,
+        tool_lists: Iterable[tuple[str, list[types.Tool]]],
+        incomplete: bool = False,
+    ):
+        owners: dict[str, str] = {}
+        collisions: dict[str, list[str]] = {}
+        for client_name, tools in tool_lists:
+            for tool in tools:
+                owner = owners.setdefault(tool.name, client_name)
+                if owner != client_name:
+                    collisions.setdefault(tool.name, [owner]).append(client_name)
+
+        for tool_name, client_names in collisions.items():
+            logger.warning("Tool '{}' is provided by multiple clients {}, calls will be routed to '{}'.",
+                           tool_name, client_names, client_names[0])
+
+        self._owners = owners
+        self._collisions = collisions
+        self._version = catalog_version
+        self._built_at = time.monotonic()
+        self.incomplete = incomplete
+
+    def get(self, tool_name: str) -> str | None:
+        return self._owners.get(tool_name)
+
+    @property
+    def collisions(self) -> dict[str, list[str]]:
+        return self._collisions
@@ -0,0 +1,87 @@
+import bisect
+import math
+import re
+from typing import Callable, Iterable
+
+from mcp import types
+
+
+# weight of a token by the field it was found in
+NAME_WEIGHT = 3.0
+NAMESPACE_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+# query tokens of at least this length also match the longer tokens they start, at half weight
+MIN_PREFIX_LENGTH = 3
+
+_WORD = re.compile(r"[^\W_]+")
+# splits camelCase and letters from digits, e.g. `getHTTPStatus2` into get, http, status, 2
+_PART = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+|[^\W\d_a-zA-Z]+")
+
+def tokenize(text: str) -> list[str]:
+    return [part.lower() for word in _WORD.findall(text) for part in _PART.findall(word)]
+
+class ToolSearchIndex:
+    """
+    Inverted index of the tools of all clients, by the tokens of their names, descriptions and client names.
+    Searches rank the tools by the weights of the matched tokens, rarer tokens weighing more.
+    """
+
+    def __init__(self):
+        self._tools: list[tuple[str, types.Tool]] = []
+        # token -> index of the tool in `_tools` -> summed weight of the fields containing the token
+        self._postings: dict[str, dict[int, float]] = {}
+        self._vocabulary: list[str] = []
+
+    def rebuild(self, tool_lists: Iterable[tuple[str, list[types.Tool]]]):
+        tools: list[tuple[str, types.Tool]] = []
+        postings: dict[str, dict[int, float]] = {}
+        for client_name, client_tools in tool_lists:
+            for tool in client_tools:
+                doc = len(tools)
+                tools.append((client_name, tool))
+                fields = ((tool.name, NAME_WEIGHT), (client_name, NAMESPACE_WEIGHT), (tool.description or "", DESCRIPTION_WEIGHT))
+                for text, weight in fields:
+                    for token in set(tokenize(text)):
+                        weights = postings.setdefault(token, {})
+                        weights[doc] = weights.get(doc, 0) + weight
+
+        self._tools = tools
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+
+    def search(
+        self,
+        query: str,
+        limit: int,
+        accept: Callable[[str, types.Tool], bool] | None = None,
+    ) -> list[tuple[str, types.Tool]]:
+        """Returns up to `limit` accepted tools matching any token of `query`, with their client names, best first."""
+        scores: dict[int, float] = {}
+        for token in set(tokenize(query)):
+            for indexed, factor in self._matches(token):
+                weights = self._postings[indexed]
+                idf = math.log(1 + len(self._tools) / len(weights))
+                for doc, weight in weights.items():
+                    scores[doc] = scores.get(doc, 0) + weight * factor * idf
+
+        # ties keep the order of the catalog
+        ranked = sorted(scores, key=lambda doc: (-scores[doc], doc))
+        found = []
+        for doc in ranked:
+            client_name, tool = self._tools[doc]
+            if accept is not None and not accept(client_name, tool):
+                continue
+            found.append((client_name, tool))
+            if len(found) == limit:
+                break
+        return found
+
+    def _matches(self, token: str) -> list[tuple[str, float]]:
+        matches = [(token, 1.0)] if token in self._postings else []
+        if len(token) < MIN_PREFIX_LENGTH:
+            return matches
+        i = bisect.bisect_right(self._vocabulary, token)
+        while i < len(self._vocabulary) and self._vocabulary[i].startswith(token):
+            matches.append((self._vocabulary[i], 0.5))
+            i += 1
+        return matches
@@ -0,0 +1,132 @@
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator
+from urllib.parse import urljoin, urlparse
+
+import anyio
+import httpx
+from anyio.abc import TaskStatus
+from anyio.streams.memory import MemoryObjectReceiveStream, MemoryObjectSendStream
+from httpx_sse import EventSource, aconnect_sse
+from loguru import logger
+from mcp import types
+from mcp.client.streamable_http import RequestContext, StreamableHTTPTransport
+from mcp.shared.message import SessionMessage
+
+
+# the timeouts of the SDK's `streamablehttp_client`, the read timeout bounds the wait for the next event
+HTTP_TIMEOUT = httpx.Timeout(30, read=60 * 5)
+
+Streams = tuple[MemoryObjectReceiveStream[SessionMessage | Exception], MemoryObjectSendStream[SessionMessage]]
+
+class _PooledTransport(StreamableHTTPTransport):
+    async def _handle_sse_response(self, response: httpx.Response, ctx: RequestContext) -> None:
+        """
+        Reads the SSE response of a request up to its end, where the SDK stops at the JSON-RPC response,
+        a connection closed with a response partly read cannot go back to the pool.
+        """
+        resumption_callback = ctx.metadata.on_resumption_token_update if ctx.metadata else None
+        try:
+            complete = False
+            async for sse in EventSource(response).aiter_sse():
+                if not complete:
+                    complete = await self._handle_sse_event(sse, ctx.read_stream_writer, resumption_callback=resumption_callback)
+        except Exception as e:
+            logger.error("Error reading SSE stream of '{}': {}", self.url, e)
+            await ctx.read_stream_writer.send(e)
+
+@asynccontextmanager
+async def streamablehttp_client_over(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: dict[str, str] | None = None,
+    timeout: httpx.Timeout = HTTP_TIMEOUT,
+) -> AsyncIterator[Streams]:
+    """
+    The SDK's `streamablehttp_client`, sending its requests through `client`
+    instead of a client of its own, e.g. to connect over a Unix socket or to share a connection pool.
+    """
+    transport = _PooledTransport(url, headers,
+                                 timedelta(seconds=timeout.connect or 0), timedelta(seconds=timeout.read or 0))
+    read_stream_writer, read_stream = anyio.create_memory_object_stream[SessionMessage | Exception](0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream[SessionMessage](0)
+
+    async with anyio.create_task_group() as tg:
+        try:
+            def start_get_stream():
+                tg.start_soon(transport.handle_get_stream, client, read_stream_writer)
+
+            tg.start_soon(transport.post_writer, client, write_stream_reader, read_stream_writer,
+                          write_stream, start_get_stream, tg)
+            try:
+                yield read_stream, write_stream
+            finally:
+                if transport.session_id:
+                    await transport.terminate_session(client)
+                tg.cancel_scope.cancel()
+        finally:
+            await read_stream_writer.aclose()
+            await write_stream.aclose()
+
+@asynccontextmanager
+async def sse_client_over(
+    client: httpx.AsyncClient,
+    url: str,
+    headers: dict[str, str] | None = None,
+    timeout: httpx.Timeout = HTTP_TIMEOUT,
+) -> AsyncIterator[Streams]:
+    """The SDK's `sse_client`, sending its requests through `client` instead of a client of its own."""
+    read_stream_writer, read_stream = anyio.create_memory_object_stream[SessionMessage | Exception](0)
+    write_stream, write_stream_reader = anyio.create_memory_object_stream[SessionMessage](0)
+
+    async with anyio.create_task_group() as tg:
+        try:
+            async with aconnect_sse(client, "GET", url, headers=headers, timeout=timeout) as event_source:
+                event_source.response.raise_for_status()
+
+                async def sse_reader(task_status: TaskStatus[str] = anyio.TASK_STATUS_IGNORED):
+                    try:
+                        async for sse in event_source.aiter_sse():
+                            match sse.event:
+                                case "endpoint":
+                                    endpoint_url = urljoin(url, sse.data)
+                                    if urlparse(endpoint_url)[:2] != urlparse(url)[:2]:
+                                        raise ValueError(f"Endpoint origin does not match connection origin: {endpoint_url}")
+                                    task_status.started(endpoint_url)
+                                case "message":
+                                    try:
+                                        message = types.JSONRPCMessage.model_validate_json(sse.data)
+                                    except Exception as e:
+                                        await read_stream_writer.send(e)
+                                        continue
+                                    await read_stream_writer.send(SessionMessage(message))
+                                case _:
+                                    logger.warning("Unknown SSE event from '{}': {}", url, sse.event)
+                    except Exception as e:
+                        await read_stream_writer.send(e)
+                    finally:
+                        await read_stream_writer.aclose()
+
+                async def post_writer(endpoint_url: str):
+                    try:
+                        async with write_stream_reader:
+                            async for session_message in write_stream_reader:
+                                response = await client.post(
+                                    endpoint_url,
+                                    headers=headers,
+                                    json=session_message.message.model_dump(by_alias=True, mode="json", exclude_none=True))
+                                response.raise_for_status()
+                    except Exception as e:
+                        logger.error("Failed to send message to '{}': {}", endpoint_url, e)
+                    finally:
+                        await write_stream.aclose()
+
+                endpoint_url = await tg.start(sse_reader)
+                tg.start_soon(post_writer, endpoint_url)
+                try:
+                    yield read_stream, write_stream
+                finally:
+                    tg.cancel_scope.cancel()
+        finally:
+            await read_stream_writer.aclose()
+            await write_stream.aclose()
@@ -0,0 +1,90 @@
+import asyncio
+import json
+import os
+import signal
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from loguru import logger
+
+from .client import ClientManager, config_parser
+from .client.client_config import ClientConfig, through_supervisor
+from .settings import Settings
+
+
+def read_client_configs(path: str, supervisor_socket: str | None = None) -> list[ClientConfig]:
+    with open(path, "r") as f:
+        mcp_config = json.load(f)
+    client_configs = config_parser(mcp_config)
+    if supervisor_socket is not None:
+        return through_supervisor(client_configs, supervisor_socket)
+    return client_configs
+
+class ConfigWatcher:
+    """
+    Reloads the clients from the config file on SIGHUP, on `reload()` calls
+    and, with `config_watch_interval` set, whenever the file changes.
+    """
+
+    def __init__(self, settings: Settings, client_manager: ClientManager):
+        self._path = settings.config
+        self._supervisor_socket = settings.supervisor_socket
+        self._interval = settings.config_watch_interval
+        self._client_manager = client_manager
+        self._lock = asyncio.Lock()
+        self._tasks: set[asyncio.Task] = set()
+
+    async def reload(self, trigger: str) -> tuple[list[str], list[str], list[str]]:
+        """Returns the names of the added, changed and removed clients."""
+        async with self._lock:
+            logger.info("Reloading config '{}' on {}.", self._path, trigger)
+            client_configs = read_client_configs(self._path, self._supervisor_socket)
+            return await self._client_manager.reload(client_configs)
+
+    async def _reload_logged(self, trigger: str):
+        try:
+            added, changed, removed = await self.reload(trigger)
+            if len(added) + len(changed) + len(removed) == 0:
+                logger.info("Config '{}' has no client changes.", self._path)
+        except Exception as e:
+            logger.error("Failed to reload config '{}': {}", self._path, e)
+
+    def _file_state(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self._path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    async def _poll(self, interval: float):
+        state = self._file_state()
+        while True:
+            await asyncio.sleep(interval)
+            current = self._file_state()
+            if current is not None and current != state:
+                state = current
+                await self._reload_logged("config file change")
+
+    def _spawn_reload(self, trigger: str):
+        task = asyncio.create_task(self._reload_logged(trigger))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @asynccontextmanager
+    async def watch(self) -> AsyncIterator[None]:
+        loop = asyncio.get_running_loop()
+        try:
+            loop.add_signal_handler(signal.SIGHUP, self._spawn_reload, "SIGHUP")
+            handles_signal = True
+        except (AttributeError, NotImplementedError, RuntimeError):
+            # no SIGHUP on Windows, and signals are only handled by the main thread
+            handles_signal = False
+        if self._interval is not None:
+            self._tasks.add(asyncio.create_task(self._poll(self._interval)))
+        try:
+            yield
+        finally:
+            if handles_signal:
+                loop.remove_signal_handler(signal.SIGHUP)
+            for task in self._tasks:
+                task.cancel()
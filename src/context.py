@@ -0,0 +1,44 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from .client.client_manager import ClientManager
+from .settings import Settings
+
+
+# bound once at startup, shared by every request
+_settings: Settings | None = None
+_client_manager: ClientManager | None = None
+# set by the `/{name}/sse` and `/{name}/mcp` endpoints, inherited by the tasks handling their MCP requests
+namespace: ContextVar[str | None] = ContextVar("namespace", default=None)
+# set by the stateless streamable HTTP endpoints, whose sessions only last one request, to the client address
+caller: ContextVar[str | None] = ContextVar("caller", default=None)
+
+def bind(settings: Settings, client_manager: ClientManager):
+    global _settings, _client_manager
+    _settings = settings
+    _client_manager = client_manager
+
+def get_settings() -> Settings:
+    assert _settings is not None, "settings are not bound"
+    return _settings
+
+def get_client_manager() -> ClientManager:
+    assert _client_manager is not None, "client manager is not bound"
+    return _client_manager
+
+@contextmanager
+def bind_namespace(name: str) -> Iterator[None]:
+    token = namespace.set(name)
+    try:
+        yield
+    finally:
+        namespace.reset(token)
+
+@contextmanager
+def bind_caller(address: str | None) -> Iterator[None]:
+    token = caller.set(address)
+    try:
+        yield
+    finally:
+        caller.reset(token)
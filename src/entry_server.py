@@ -1,20 +1,23 @@
-import json
 import mcp.server.sse
 import mcp.server.stdio
 from loguru import logger
 from starlette.authentication import requires
 from starlette.middleware import Middleware
-from starlette_context.middleware import ContextMiddleware
 from starlette.routing import Route, Mount
-from starlette.responses import Response
+from starlette.responses import JSONResponse, Response
 from starlette.applications import Starlette
-from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 
+from . import context, metrics
+from .event_store import create_event_store
+from .log import log_request
 from .lifespan import sse_lifespan_factory, streamable_lifespan_factory
-from .client import config_parser, ClientManager
+from .client import ClientManager
+from .config_watcher import ConfigWatcher, read_client_configs
 from .proxy import proxy_server_factory
-from .middlewares.context import ClientManagerPlugin, NamespacePlugin, SettingsPlugin
+from .proxy.list_changed import ListChangedNotifier
+from .proxy.subscriptions import notify_subscribers
 from .middlewares.auth import AuthBackend, ConditionalAuthMiddleware
+from .session_manager import SessionManager
 from .settings import Settings
 
 
@@ -22,32 +25,52 @@ class EntryServer:
     def __init__(self, settings: Settings) -> None:
         self._starlette_app = None
         self._settings = settings
-        self._server = proxy_server_factory()
+        self._notifier = ListChangedNotifier()
+        self._server = proxy_server_factory(self._notifier)
         self._init_client_manager()
 
     def _init_client_manager(self):
-        with open(self._settings.config, "r") as f:
-            mcp_config = json.load(f)
-
-        client_configs = config_parser(mcp_config)
-        self._client_manager = ClientManager(self._settings.encoding, client_configs)
+        client_configs = read_client_configs(self._settings.config, self._settings.supervisor_socket)
+        self._client_manager = ClientManager(self._settings, client_configs)
+        self._client_manager.on_list_changed(self._notifier.notify)
+        self._client_manager.on_resource_updated(notify_subscribers)
+        self._config_watcher = ConfigWatcher(self._settings, self._client_manager)
+        context.bind(self._settings, self._client_manager)
 
     @property
     def app(self) -> Starlette | None:
         return self._starlette_app
 
+    @staticmethod
+    @requires("authenticated")
+    async def handle_metrics(request):
+        return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+    @requires("authenticated")
+    async def handle_reload(self, request):
+        try:
+            added, changed, removed = await self._config_watcher.reload("admin request")
+        except Exception as e:
+            logger.error("Failed to reload config: {}", e)
+            return JSONResponse({"error": str(e)}, status_code=400)
+        return JSONResponse({"added": added, "changed": changed, "removed": removed})
+
     async def start_stdio_server(self):
-        async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-            await self._server.run(
-                read_stream,
-                write_stream,
-                self._server.create_initialization_options())
+        await self._client_manager.init_clients()
+        try:
+            async with self._config_watcher.watch(), mcp.server.stdio.stdio_server() as (read_stream, write_stream):
+                await self._server.run(
+                    read_stream,
+                    write_stream,
+                    self._server.create_initialization_options())
+        finally:
+            await self._client_manager.close()
 
     def start_sse_server(self):
         @requires("authenticated")
         async def handle_sse(request):
             nonlocal sse
-            logger.info("SSE connection received")
+            log_request("SSE connection received")
             async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
                 await self._server.run(
                     streams[0],
@@ -59,63 +82,68 @@ class EntryServer:
         async def handle_named_sse(request):
             nonlocal sse
             name = request.path_params["name"]
-            logger.info("SSE connection received for server: {}", name)
-            async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
-                await self._server.run(
-                    streams[0],
-                    streams[1],
-                    self._server.create_initialization_options())
+            log_request("SSE connection received for server: {}", name)
+            with context.bind_namespace(name):
+                async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
+                    await self._server.run(
+                        streams[0],
+                        streams[1],
+                        self._server.create_initialization_options())
             return Response()
 
         logger.info("Starting SSE server")
         sse = mcp.server.sse.SseServerTransport("/messages/")
         self._starlette_app = Starlette(
             middleware=[
-                Middleware(ContextMiddleware, plugins=[
-                    SettingsPlugin(self._settings),
-                    ClientManagerPlugin(self._client_manager),
-                    NamespacePlugin(),
-                ]),
                 Middleware(ConditionalAuthMiddleware, backend=AuthBackend())
             ],
             routes=[
+                Route("/metrics", endpoint=self.handle_metrics, methods=["GET"]),
+                Route("/admin/reload", endpoint=self.handle_reload, methods=["POST"]),
                 Route("/sse", endpoint=handle_sse, methods=["GET"]),
                 Route("/{name}/sse", endpoint=handle_named_sse, methods=["GET"]),
                 Mount("/messages/", app=sse.handle_post_message),
             ],
-            lifespan=sse_lifespan_factory(self._client_manager),
+            lifespan=sse_lifespan_factory(self._client_manager, self._config_watcher),
             debug=self._settings.debug,
         )
 
     def start_streamable_server(self):
+        def caller_address(scope) -> str | None:
+            # a stateless session only lasts one request, its caller is told apart by address instead
+            if not stateless or scope.get("client") is None:
+                return None
+            return scope["client"][0]
+
         async def handle_streamable_http(scope, receive, send) -> None:
-            logger.info("Streamable HTTP connection received")
-            await self._session_manager.handle_request(scope, receive, send)
+            log_request("Streamable HTTP connection received")
+            with context.bind_caller(caller_address(scope)):
+                await self._session_manager.handle_request(scope, receive, send)
 
         async def handle_named_streamable_http(scope, receive, send) -> None:
             name = scope["path_params"]["name"]
-            logger.info("Streamable HTTP connection received for server: {}", name)
-            await self._session_manager.handle_request(scope, receive, send)
+            log_request("Streamable HTTP connection received for server: {}", name)
+            with context.bind_namespace(name), context.bind_caller(caller_address(scope)):
+                await self._session_manager.handle_request(scope, receive, send)
 
         logger.info("Starting Streamable server")
-        self._session_manager = StreamableHTTPSessionManager(
+        stateless = self._settings.stateless_http
+        self._session_manager = SessionManager(
             app=self._server,
-            event_store=None,
-            stateless=True,
+            event_store=None if stateless else create_event_store(self._settings),
+            stateless=stateless,
+            idle_timeout=self._settings.session_idle_timeout,
         )
         self._starlette_app = Starlette(
             middleware=[
-                Middleware(ContextMiddleware, plugins=[
-                    SettingsPlugin(self._settings),
-                    ClientManagerPlugin(self._client_manager),
-                    NamespacePlugin(),
-                ]),
                 Middleware(ConditionalAuthMiddleware, backend=AuthBackend()),
             ],
             routes=[
+                Route("/metrics", endpoint=self.handle_metrics, methods=["GET"]),
+                Route("/admin/reload", endpoint=self.handle_reload, methods=["POST"]),
                 Mount("/mcp", app=handle_streamable_http),
                 Mount("/{name}/mcp", app=handle_named_streamable_http),
             ],
-            lifespan=streamable_lifespan_factory(self._client_manager, self._session_manager),
+            lifespan=streamable_lifespan_factory(self._client_manager, self._config_watcher, self._session_manager),
             debug=self._settings.debug,
         )
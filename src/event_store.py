@@ -0,0 +1,113 @@
+import asyncio
+import sqlite3
+import threading
+from collections import deque
+
+from mcp.server.streamable_http import EventCallback, EventId, EventMessage, EventStore, StreamId
+from mcp.types import JSONRPCMessage
+
+from .settings import Settings
+
+
+class MemoryEventStore(EventStore):
+    """
+    Keeps the last `max_events` events of all streams in memory,
+    clients can resume a stream as long as the last event they received is kept.
+    """
+
+    def __init__(self, max_events: int):
+        self._max_events = max_events
+        self._next_id = 0
+        # event ids are increasing integers, so the events of a stream stay sorted
+        self._streams: dict[StreamId, deque[tuple[int, JSONRPCMessage]]] = {}
+        self._event_streams: dict[int, StreamId] = {}
+        self._order: deque[int] = deque()
+
+    async def store_event(self, stream_id: StreamId, message: JSONRPCMessage) -> EventId:
+        self._next_id += 1
+        event_id = self._next_id
+        self._streams.setdefault(stream_id, deque()).append((event_id, message))
+        self._event_streams[event_id] = stream_id
+        self._order.append(event_id)
+
+        while len(self._order) > self._max_events:
+            oldest_id = self._order.popleft()
+            oldest_stream_id = self._event_streams.pop(oldest_id)
+            stream = self._streams[oldest_stream_id]
+            stream.popleft()
+            if len(stream) == 0:
+                del self._streams[oldest_stream_id]
+        return str(event_id)
+
+    async def replay_events_after(self, last_event_id: EventId, send_callback: EventCallback) -> StreamId | None:
+        try:
+            last_id = int(last_event_id)
+        except ValueError:
+            return None
+        stream_id = self._event_streams.get(last_id)
+        if stream_id is None:
+            return None
+
+        # copied as the stream may grow while the events are sent
+        events = [(event_id, message) for event_id, message in self._streams[stream_id] if event_id > last_id]
+        for event_id, message in events:
+            await send_callback(EventMessage(message, str(event_id)))
+        return stream_id
+
+class SqliteEventStore(EventStore):
+    """
+    Keeps the last `max_events` events of all streams in a SQLite database,
+    for histories too large to be kept in memory.
+    The queries run in a worker thread to not block the event loop.
+    """
+
+    def __init__(self, path: str, max_events: int):
+        self._max_events = max_events
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS events ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, stream_id TEXT NOT NULL, message TEXT NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS events_stream ON events (stream_id, id)")
+
+    def _store(self, stream_id: StreamId, message: str) -> int:
+        with self._lock, self._connection:
+            event_id = self._connection.execute(
+                "INSERT INTO events (stream_id, message) VALUES (?, ?)", (stream_id, message)).lastrowid
+            assert event_id is not None
+            if event_id % 100 == 0:
+                self._connection.execute("DELETE FROM events WHERE id <= ?", (event_id - self._max_events,))
+            return event_id
+
+    def _events_after(self, last_id: int) -> tuple[StreamId | None, list[tuple[int, str]]]:
+        with self._lock:
+            row = self._connection.execute("SELECT stream_id FROM events WHERE id = ?", (last_id,)).fetchone()
+            if row is None:
+                return None, []
+            stream_id = row[0]
+            events = self._connection.execute(
+                "SELECT id, message FROM events WHERE stream_id = ? AND id > ? ORDER BY id", (stream_id, last_id)).fetchall()
+            return stream_id, events
+
+    async def store_event(self, stream_id: StreamId, message: JSONRPCMessage) -> EventId:
+        serialized = message.model_dump_json(by_alias=True, exclude_none=True)
+        event_id = await asyncio.to_thread(self._store, stream_id, serialized)
+        return str(event_id)
+
+    async def replay_events_after(self, last_event_id: EventId, send_callback: EventCallback) -> StreamId | None:
+        try:
+            last_id = int(last_event_id)
+        except ValueError:
+            return None
+        stream_id, events = await asyncio.to_thread(self._events_after, last_id)
+        for event_id, message in events:
+            await send_callback(EventMessage(JSONRPCMessage.model_validate_json(message), str(event_id)))
+        return stream_id
+
+def create_event_store(settings: Settings) -> EventStore | None:
+    match settings.event_store:
+        case "memory": return MemoryEventStore(settings.event_store_size)
+        case "sqlite": return SqliteEventStore(settings.event_store_path, settings.event_store_size)
+        case None: return None
@@ -4,14 +4,16 @@ from loguru import logger
 from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
 
 from .client import ClientManager
+from .config_watcher import ConfigWatcher
 
-def sse_lifespan_factory(client_manager: ClientManager):
+def sse_lifespan_factory(client_manager: ClientManager, config_watcher: ConfigWatcher):
     @asynccontextmanager
     async def sse_lifespan(_) -> AsyncIterator[dict]:
         logger.info("SSE server lifespan started")
         await client_manager.init_clients()
         try:
-            yield {"client_manager": client_manager}
+            async with config_watcher.watch():
+                yield {"client_manager": client_manager}
         finally:
             await client_manager.close()
             logger.info("SSE server lifespan ended")
@@ -19,6 +21,7 @@ def sse_lifespan_factory(client_manager: ClientManager):
 
 def streamable_lifespan_factory(
     client_manager: ClientManager,
+    config_watcher: ConfigWatcher,
     session_manager: StreamableHTTPSessionManager,
 ):
     @asynccontextmanager
@@ -28,7 +31,8 @@ def streamable_lifespan_factory(
             logger.info("Streamable HTTP server lifespan started")
             await client_manager.init_clients()
             try:
-                yield {"client_manager": client_manager}
+                async with config_watcher.watch():
+                    yield {"client_manager": client_manager}
             finally:
                 await client_manager.close()
                 logger.info("Streamable HTTP server lifespan ended")
@@ -0,0 +1,56 @@
+import functools
+import random
+import sys
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, Callable, Iterator, ParamSpec, TypeVar
+from loguru import logger
+
+from .settings import Settings
+
+
+_sample_rate = 1.0
+# whether the per-request INFO logs of the request being handled are written, decided once per request
+_sampled: ContextVar[bool | None] = ContextVar("sampled", default=None)
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+def setup_logging(settings: Settings):
+    """Replaces the default loguru sink, which logs everything synchronously, with one configured from the settings."""
+    global _sample_rate
+    _sample_rate = settings.log_sample_rate
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level="DEBUG" if settings.debug else settings.log_level,
+        # written by a background thread, so slow terminals or pipes do not block the event loop
+        enqueue=settings.log_enqueue,
+    )
+
+@contextmanager
+def sample_request() -> Iterator[None]:
+    """Decides whether the per-request INFO logs written within the context are written, all or none of them."""
+    token = _sampled.set(_sample_rate >= 1 or random.random() < _sample_rate)
+    try:
+        yield
+    finally:
+        _sampled.reset(token)
+
+def sampled(handler: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+    """Samples the per-request INFO logs of every call of `handler` as one request."""
+    @functools.wraps(handler)
+    async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        with sample_request():
+            return await handler(*args, **kwargs)
+    return wrapper
+
+def log_request(message: str, *args, **kwargs):
+    """Logs an INFO line emitted for every request, only for the `log_sample_rate` share of the requests."""
+    sampled = _sampled.get()
+    if sampled is None:
+        # outside of a request, sampled line by line
+        sampled = _sample_rate >= 1 or random.random() < _sample_rate
+    if not sampled:
+        return
+    logger.opt(depth=1).info(message, *args, **kwargs)
@@ -2,11 +2,13 @@ from dotenv import load_dotenv
 
 from .settings import Settings
 from .entry_server import EntryServer
+from .log import setup_logging
 
 
 load_dotenv(override=True)
 
 settings = Settings()
+setup_logging(settings)
 server = EntryServer(settings)
 match settings.transport:
     case "stdio":
@@ -0,0 +1,157 @@
+import asyncio
+import functools
+import time
+from typing import Awaitable, Callable, ParamSpec, TypeVar
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+FANOUT_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra: pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        REGISTRY.append(self)
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, help, labels)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def _samples(self) -> list[str]:
+        return [f"{self.name}{_format_labels(self.labels, values)} {value}"
+                for values, value in self._values.items()]
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, *label_values: str, amount: float = 1):
+        self.inc(*label_values, amount=-amount)
+
+    def set(self, *label_values: str, value: float):
+        self._values[label_values] = value
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self._buckets = buckets
+        # per label values: [count per bucket..., count of all, sum]
+        self._values: dict[tuple[str, ...], list[float]] = {}
+
+    def observe(self, value: float, *label_values: str):
+        counts = self._values.get(label_values)
+        if counts is None:
+            counts = self._values[label_values] = [0] * (len(self._buckets) + 2)
+        for i, bound in enumerate(self._buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        counts[-2] += 1
+        counts[-1] += value
+
+    def _samples(self) -> list[str]:
+        samples = []
+        for values, counts in self._values.items():
+            cumulative = 0
+            for bound, count in zip(self._buckets, counts):
+                cumulative += count
+                labels = _format_labels(self.labels, values, 'le="%s"' % bound)
+                samples.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labels, values, 'le="+Inf"')
+            samples.append(f"{self.name}_bucket{labels} {counts[-2]}")
+            labels = _format_labels(self.labels, values)
+            samples.append(f"{self.name}_count{labels} {counts[-2]}")
+            samples.append(f"{self.name}_sum{labels} {counts[-1]}")
+        return samples
+
+REGISTRY: list[_Metric] = []
+
+def render() -> str:
+    """Renders all metrics in the Prometheus text exposition format."""
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+### Metrics
+
+PROXY_REQUESTS = Counter(
+    "mcp_proxy_requests_total", "Requests handled by the proxy.", ("method", "outcome"))
+PROXY_REQUEST_DURATION = Histogram(
+    "mcp_proxy_request_duration_seconds", "Latency of the requests handled by the proxy.", ("method",))
+PROXY_REQUESTS_IN_FLIGHT = Gauge(
+    "mcp_proxy_requests_in_flight", "Requests being handled by the proxy.", ("method",))
+PROXY_FANOUT_WIDTH = Histogram(
+    "mcp_proxy_fanout_width", "Number of backends a request was sent to.", ("method",), FANOUT_BUCKETS)
+
+BACKEND_REQUESTS = Counter(
+    "mcp_backend_requests_total", "Requests sent to the backends.", ("backend", "method", "outcome"))
+BACKEND_REQUEST_DURATION = Histogram(
+    "mcp_backend_request_duration_seconds", "Latency of the requests sent to the backends.", ("backend", "method"))
+BACKEND_COALESCED_REQUESTS = Counter(
+    "mcp_backend_coalesced_requests_total", "Requests answered by an identical request already in flight.", ("backend", "method"))
+BACKEND_REQUESTS_IN_FLIGHT = Gauge(
+    "mcp_backend_requests_in_flight", "Requests waiting for a backend response.", ("backend",))
+BACKEND_TOOL_CACHE_LOOKUPS = Counter(
+    "mcp_backend_tool_cache_lookups_total", "Calls of cacheable tools, by whether the result was cached.", ("backend", "outcome"))
+BACKEND_QUEUED_REQUESTS = Gauge(
+    "mcp_backend_queued_requests", "Requests waiting for a free slot of a backend with max_concurrency.", ("backend",))
+BACKEND_REJECTED_REQUESTS = Counter(
+    "mcp_backend_rejected_requests_total", "Requests rejected because the queue of the backend was full.", ("backend",))
+BACKEND_HTTP_REQUESTS = Counter(
+    "mcp_backend_http_requests_total", "HTTP requests sent to the sse and streamable HTTP backends.", ("host",))
+BACKEND_HTTP_CONNECTIONS = Counter(
+    "mcp_backend_http_connections_total", "HTTP connections opened to the backends, the other requests reused a pooled one.", ("host",))
+BACKEND_SESSIONS = Gauge(
+    "mcp_backend_sessions", "Connected sessions per backend.", ("backend",))
+BACKEND_CIRCUIT_OPEN = Gauge(
+    "mcp_backend_circuit_open", "Whether the circuit of the backend is open.", ("backend",))
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+def instrument(method: str):
+    """Records count, outcome, latency and in-flight requests of a proxy handler."""
+    def decorator(handler: Callable[P, Awaitable[R]]) -> Callable[P, Awaitable[R]]:
+        @functools.wraps(handler)
+        async def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+            PROXY_REQUESTS_IN_FLIGHT.inc(method)
+            start = time.perf_counter()
+            outcome = "success"
+            try:
+                return await handler(*args, **kwargs)
+            except asyncio.CancelledError:
+                outcome = "cancelled"
+                raise
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                PROXY_REQUESTS_IN_FLIGHT.dec(method)
+                PROXY_REQUESTS.inc(method, outcome)
+                PROXY_REQUEST_DURATION.observe(time.perf_counter() - start, method)
+        return wrapper
+    return decorator
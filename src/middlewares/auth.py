@@ -5,16 +5,24 @@ from starlette.authentication import (
 )
 from starlette.middleware.authentication import AuthenticationMiddleware
 
+from ..log import log_request, sample_request
+
 
 class ConditionalAuthMiddleware(AuthenticationMiddleware):
-    async def __call__(self, scope, receive, send):
+    def __init__(self, app, *args, **kwargs):
+        super().__init__(app, *args, **kwargs)
         if os.environ.get("AUTH_TOKEN") is None:
             logger.info("Authorization is disabled.")
-            scope["auth"] = AuthCredentials(["authenticated"])
-            scope["user"] = SimpleUser("default_user")
-            await self.app(scope, receive, send)
-        else:
-            await super().__call__(scope, receive, send)
+
+    async def __call__(self, scope, receive, send):
+        # the logs of the authentication and of the endpoint are sampled as one request
+        with sample_request():
+            if os.environ.get("AUTH_TOKEN") is None:
+                scope["auth"] = AuthCredentials(["authenticated"])
+                scope["user"] = SimpleUser("default_user")
+                await self.app(scope, receive, send)
+            else:
+                await super().__call__(scope, receive, send)
 
 class AuthBackend(AuthenticationBackend):
     async def authenticate(self, conn):
@@ -30,7 +38,7 @@ class AuthBackend(AuthenticationBackend):
         try:
             if default_auth is not None:
                 # use bearer token
-                logger.info("Use default Authorization header.")
+                log_request("Use default Authorization header.")
                 scheme, token = default_auth.split()
                 if scheme.lower() != "bearer":
                     logger.debug("Auth failed: Bearer prefixed token is required.")
@@ -47,13 +55,13 @@ class AuthBackend(AuthenticationBackend):
 
             elif extra_auth is not None:
                 # directly compare token
-                logger.info("Use extra X-MCP-Token header.")
+                log_request("Use extra X-MCP-Token header.")
                 if extra_auth != expected_token:
                     logger.debug("Auth failed: Invalid auth token.")
                     raise AuthenticationError("Invalid auth token.")
 
             username = "authenticated_user"
-            logger.info("Authenticated user: {}", username)
+            log_request("Authenticated user: {}", username)
             return AuthCredentials(["authenticated"]), SimpleUser(username)
 
         except ValueError:
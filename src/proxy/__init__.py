@@ -5,9 +5,18 @@ from mcp.server import Server
 from pydantic import AnyUrl
 
 from .resource import handle_list_resource_templates, handle_list_resources, handle_read_resource, handle_subscribe_resource, handle_unsubscribe_resource
+from .batch import BATCH_CALL, BATCH_CALL_TOOL, handle_batch_call
+from .search import SEARCH_TOOLS, SEARCH_TOOLS_TOOL, handle_search_tools
 from .tool import handle_list_tools, handle_call_tool
 from .prompt import handle_get_prompt, handle_list_prompts
-from .utils import use_client_manager, use_client_session, use_namespace
+from ..client.catalog import CatalogKind
+from ..log import sampled
+from ..metrics import PROXY_FANOUT_WIDTH, instrument
+from .deadline import with_deadline
+from .fanout import first_success
+from .list_changed import ListChangedNotifier
+from .subscriptions import subscriber_lifespan
+from .utils import use_client_manager, use_client_session, use_namespace, use_settings
 
 
 ####################################################################################
@@ -29,28 +38,39 @@ ServerSession._received_request = _received_request # type: ignore
 ####################################################################################
 
 
-def proxy_server_factory():
-    server = Server("one-mcp")
+def proxy_server_factory(notifier: ListChangedNotifier):
+    server = Server("one-mcp", lifespan=subscriber_lifespan)
 
-    @server.list_prompts()
-    async def _handle_list_prompts() -> list[types.Prompt]:
-        return await handle_list_prompts()
+    def watch(kind: CatalogKind):
+        # the sessions which listed a catalog are told when it changes
+        notifier.watch(kind, server.request_context.session, use_namespace())
+
+    # registered as request handlers, the decorators of the SDK do not pass the cursor through
+    async def _handle_list_prompts(request: types.ListPromptsRequest) -> types.ServerResult:
+        watch("prompts")
+        prompts, next_cursor = await handle_list_prompts(request.params.cursor if request.params else None)
+        return types.ServerResult(types.ListPromptsResult(prompts=prompts, nextCursor=next_cursor))
+    server.request_handlers[types.ListPromptsRequest] = _handle_list_prompts
 
     @server.get_prompt()
     async def _handle_get_prompt(name: str, arguments: dict[str, str] | None) -> types.GetPromptResult:
         return await handle_get_prompt(name, arguments)
 
-    @server.list_resources()
-    async def _handle_list_resources() -> list[types.Resource]:
-        return await handle_list_resources()
+    async def _handle_list_resources(request: types.ListResourcesRequest) -> types.ServerResult:
+        watch("resources")
+        resources, next_cursor = await handle_list_resources(request.params.cursor if request.params else None)
+        return types.ServerResult(types.ListResourcesResult(resources=resources, nextCursor=next_cursor))
+    server.request_handlers[types.ListResourcesRequest] = _handle_list_resources
 
     @server.read_resource()
     async def _handle_read_resource(uri: AnyUrl) -> str | bytes:
         return await handle_read_resource(uri)
 
-    @server.list_resource_templates()
-    async def _handle_list_resource_templates() -> list[types.ResourceTemplate]:
-        return await handle_list_resource_templates()
+    async def _handle_list_resource_templates(request: types.ListResourceTemplatesRequest) -> types.ServerResult:
+        watch("resource_templates")
+        templates, next_cursor = await handle_list_resource_templates(request.params.cursor if request.params else None)
+        return types.ServerResult(types.ListResourceTemplatesResult(resourceTemplates=templates, nextCursor=next_cursor))
+    server.request_handlers[types.ListResourceTemplatesRequest] = _handle_list_resource_templates
 
     @server.subscribe_resource()
     async def _handle_subscribe_resource(url: AnyUrl):
@@ -60,32 +80,55 @@ def proxy_server_factory():
     async def _handle_unsubscribe_resource(url: AnyUrl):
         return await handle_unsubscribe_resource(url)
 
-    @server.list_tools()
-    async def _handle_list_tools() -> list[types.Tool]:
-        return await handle_list_tools()
+    async def _handle_list_tools(request: types.ListToolsRequest) -> types.ServerResult:
+        watch("tools")
+        cursor = request.params.cursor if request.params else None
+        settings = use_settings()
+        builtin_tools = []
+        if settings.batch_call:
+            builtin_tools.append(BATCH_CALL_TOOL)
+        if settings.search_tools:
+            builtin_tools.append(SEARCH_TOOLS_TOOL)
+        if settings.search_tools and settings.search_tools_only:
+            return types.ServerResult(types.ListToolsResult(tools=builtin_tools))
+        tools, next_cursor = await handle_list_tools(cursor)
+        if cursor is None:
+            tools = [*builtin_tools, *tools]
+        return types.ServerResult(types.ListToolsResult(tools=tools, nextCursor=next_cursor))
+    server.request_handlers[types.ListToolsRequest] = _handle_list_tools
 
     @server.call_tool()
     async def _handle_call_tool(
         name: str,
         arguments: dict[str, str] | None,
     ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
+        if name == BATCH_CALL and use_settings().batch_call:
+            return await handle_batch_call(arguments)
+        if name == SEARCH_TOOLS and use_settings().search_tools:
+            return await handle_search_tools(arguments)
         return await handle_call_tool(name, arguments)
 
     @server.completion()
+    @instrument("completion/complete")
     async def _handle_completion(
         ref: types.PromptReference | types.ResourceReference,
         argument: types.CompletionArgument,
     ) -> types.Completion | None:
         client_manager = use_client_manager()
-        tasks = map(lambda session: session.complete(ref, {argument.name: argument.value}),
-                    client_manager.client_sessions)
-        task_results = await asyncio.gather(*tasks, return_exceptions=True)
-        for result in task_results:
-            if isinstance(result, types.Completion):
-                return result
-        return None
+        settings = use_settings()
+        calls = {name: client.complete(ref, {"name": argument.name, "value": argument.value})
+                 for name, client in client_manager.available_clients}
+        PROXY_FANOUT_WIDTH.observe(len(calls), "completion/complete")
+        found = await first_success(calls,
+                                    accept=lambda result: len(result.completion.values) > 0,
+                                    timeout=settings.fanout_timeout)
+        if found is None:
+            return None
+        _, result = found
+        return result.completion
 
     @server.progress_notification()
+    @instrument("notifications/progress")
     async def _handle_progress_notification(
         progressToken: str | int,
         progress: float,
@@ -102,11 +145,13 @@ def proxy_server_factory():
             return
 
         client_manager = use_client_manager()
+        PROXY_FANOUT_WIDTH.observe(len(client_manager.client_sessions), "notifications/progress")
         tasks = map(lambda session: session.send_progress_notification(progressToken, progress, total, message),
                     client_manager.client_sessions)
         await asyncio.gather(*tasks, return_exceptions=True)
 
     @server.set_logging_level()
+    @instrument("logging/setLevel")
     async def _handle_set_logging_level(logging_level: types.LoggingLevel):
         namespace = use_namespace()
         if namespace is not None:
@@ -118,7 +163,12 @@ def proxy_server_factory():
             return
 
         client_manager = use_client_manager()
+        PROXY_FANOUT_WIDTH.observe(len(client_manager.client_sessions), "logging/setLevel")
         tasks = map(lambda client: client.set_logging_level(logging_level), client_manager.client_sessions)
         await asyncio.gather(*tasks)
 
+    for request_type, handler in list(server.request_handlers.items()):
+        # the MCP requests of a session are sampled one by one, not along with the request of the connection
+        server.request_handlers[request_type] = with_deadline(sampled(handler))
+
     return server
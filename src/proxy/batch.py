@@ -0,0 +1,80 @@
+import asyncio
+import json
+from typing import Any
+
+from mcp import types
+
+from ..log import log_request
+from ..metrics import PROXY_FANOUT_WIDTH, instrument
+from .tool import call_tool
+from .utils import use_settings
+
+
+BATCH_CALL = "batch_call"
+
+BATCH_CALL_TOOL = types.Tool(
+    name=BATCH_CALL,
+    description=(
+        "Calls several tools concurrently and returns all their results at once. "
+        "Only use it for calls which do not depend on the results of each other. "
+        "Returns a JSON array with, for every call and in the same order, "
+        "the tool `name`, whether it failed in `isError` and its `content`."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "calls": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "name": {"type": "string", "description": "Name of the tool, as listed by tools/list"},
+                        "arguments": {"type": "object", "description": "Arguments of the tool"},
+                    },
+                    "required": ["name"],
+                },
+            },
+        },
+        "required": ["calls"],
+    },
+)
+
+def parse_calls(arguments: dict[str, Any] | None) -> list[tuple[str, dict[str, Any] | None]]:
+    calls = (arguments or {}).get("calls")
+    if not isinstance(calls, list):
+        raise ValueError("'calls' must be a list of {name, arguments} objects")
+    parsed = []
+    for i, call in enumerate(calls):
+        if not isinstance(call, dict) or not isinstance(call.get("name"), str):
+            raise ValueError(f"Call {i} must be an object with a 'name' string")
+        call_arguments = call.get("arguments")
+        if call_arguments is not None and not isinstance(call_arguments, dict):
+            raise ValueError(f"The 'arguments' of call {i} must be an object")
+        parsed.append((call["name"], call_arguments))
+    return parsed
+
+@instrument("tools/call")
+async def handle_batch_call(arguments: dict[str, Any] | None) -> list[types.TextContent]:
+    """
+    Calls the tools of `arguments["calls"]` like separate tools/call requests, at most `batch_call_concurrency`
+    at once, and returns their results, including the failed ones, as a JSON array in a single text content.
+    """
+    calls = parse_calls(arguments)
+    log_request("Handling batch call of {} tool(s)", len(calls))
+    PROXY_FANOUT_WIDTH.observe(len(calls), "tools/call")
+    semaphore = asyncio.Semaphore(use_settings().batch_call_concurrency)
+
+    async def run(name: str, call_arguments: dict[str, Any] | None) -> dict[str, Any]:
+        async with semaphore:
+            try:
+                result = await call_tool(name, call_arguments)
+            except Exception as e:
+                result = types.CallToolResult(content=[types.TextContent(type="text", text=str(e))], isError=True)
+        return {
+            "name": name,
+            "isError": result.isError,
+            "content": [content.model_dump(mode="json", by_alias=True, exclude_none=True) for content in result.content],
+        }
+
+    results = await asyncio.gather(*(run(name, call_arguments) for name, call_arguments in calls))
+    return [types.TextContent(type="text", text=json.dumps(results, ensure_ascii=False))]
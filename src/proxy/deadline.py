@@ -0,0 +1,40 @@
+import asyncio
+import functools
+from typing import Any, Awaitable, Callable
+
+import httpx
+from mcp import McpError, types
+
+
+def client_timeout(request: Any) -> float | None:
+    """The seconds set by the client in the `_meta.timeout` of the request, if any."""
+    meta = getattr(getattr(request, "params", None), "meta", None)
+    if meta is None or meta.model_extra is None:
+        return None
+    timeout = meta.model_extra.get("timeout")
+    if type(timeout) not in (int, float) or timeout <= 0:
+        return None
+    return timeout
+
+def with_deadline(handler: Callable[[Any], Awaitable[types.ServerResult]]) -> Callable[[Any], Awaitable[types.ServerResult]]:
+    """
+    Bounds the handling of a request by its `_meta.timeout`, once it expires
+    the backend requests still in flight are cancelled and the client gets a timeout error.
+    """
+    @functools.wraps(handler)
+    async def wrapper(request: Any) -> types.ServerResult:
+        timeout = client_timeout(request)
+        if timeout is None:
+            return await handler(request)
+
+        deadline = asyncio.timeout(timeout)
+        try:
+            async with deadline:
+                return await handler(request)
+        except TimeoutError:
+            if not deadline.expired():
+                raise
+            raise McpError(types.ErrorData(
+                code=httpx.codes.REQUEST_TIMEOUT,
+                message=f"Request not answered within its timeout of {timeout} seconds"))
+    return wrapper
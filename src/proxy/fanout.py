@@ -0,0 +1,48 @@
+import asyncio
+from typing import Awaitable, Callable, TypeVar
+from loguru import logger
+
+
+T = TypeVar("T")
+
+async def first_success(
+    calls: dict[str, Awaitable[T]],
+    accept: Callable[[T], bool] | None = None,
+    timeout: float | None = None,
+) -> tuple[str, T] | None:
+    """
+    Runs the calls, keyed by client name, concurrently and returns the name and result
+    of the first one which succeeds with an accepted result, the others are cancelled.
+    Returns `None` if none of them does within `timeout` seconds.
+    """
+    if len(calls) == 0:
+        return None
+
+    loop = asyncio.get_running_loop()
+    names = {asyncio.ensure_future(call): name for name, call in calls.items()}
+    pending = set(names.keys())
+    deadline = None if timeout is None else loop.time() + timeout
+    try:
+        while len(pending) > 0:
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            if len(done) == 0:
+                logger.warning("Fan-out timed out after {} seconds, cancelling clients: {}",
+                               timeout, [names[task] for task in pending])
+                return None
+
+            for task in done:
+                if task.cancelled():
+                    continue
+                exception = task.exception()
+                if exception is not None:
+                    logger.debug("Fan-out call to client '{}' failed: {}", names[task], exception)
+                    continue
+                result = task.result()
+                if accept is None or accept(result):
+                    return names[task], result
+        return None
+    finally:
+        for task in pending: task.cancel()
+        # wait for the cancelled calls and retrieve the failures of those not looked at
+        await asyncio.gather(*names, return_exceptions=True)
@@ -0,0 +1,50 @@
+import asyncio
+from weakref import WeakKeyDictionary
+
+from loguru import logger
+from mcp import ServerSession
+
+from ..client.catalog import CatalogKind
+
+
+class ListChangedNotifier:
+    """
+    Forwards the changes of the client catalogs to the frontend sessions which listed them,
+    as `notifications/*/list_changed`. A namespaced session is only notified of the changes of its client.
+    Sessions are held weakly, closed ones are forgotten once collected.
+    """
+
+    def __init__(self):
+        # the namespace of every session which listed a kind, `None` for the aggregated endpoints
+        self._sessions: dict[CatalogKind, WeakKeyDictionary[ServerSession, str | None]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def watch(self, kind: CatalogKind, session: ServerSession, namespace: str | None):
+        self._sessions.setdefault(kind, WeakKeyDictionary())[session] = namespace
+
+    def notify(self, name: str, kinds: tuple[CatalogKind, ...]):
+        notified: set[tuple[ServerSession, str]] = set()
+        for kind in kinds:
+            # resources and resource templates share a single notification
+            notification = "resources" if kind == "resource_templates" else kind
+            for session, namespace in list(self._sessions.get(kind, {}).items()):
+                if namespace not in (None, name) or (session, notification) in notified:
+                    continue
+                notified.add((session, notification))
+                self._spawn(self._send(kind, session, notification))
+
+    async def _send(self, kind: CatalogKind, session: ServerSession, notification: str):
+        try:
+            match notification:
+                case "tools": await session.send_tool_list_changed()
+                case "prompts": await session.send_prompt_list_changed()
+                case "resources": await session.send_resource_list_changed()
+        except Exception as e:
+            # the session is gone, e.g. its client disconnected
+            logger.debug("Failed to send {} list changed notification: {}", notification, repr(e))
+            self._sessions[kind].pop(session, None)
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
@@ -0,0 +1,95 @@
+import base64
+import binascii
+import json
+from typing import Callable
+from loguru import logger
+
+from ..client.catalog import CatalogItem, CatalogKind
+from .utils import use_client_manager, use_namespace, use_settings, with_namespace
+
+
+# position of the next page: client name, cursor of the client's page and offset in that page
+Position = tuple[str, str | None, int]
+
+def encode_cursor(position: Position) -> str:
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def decode_cursor(cursor: str) -> Position:
+    try:
+        name, client_cursor, offset = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: '{cursor}'")
+    if not isinstance(name, str) or not isinstance(offset, int) or not (client_cursor is None or isinstance(client_cursor, str)):
+        raise ValueError(f"Invalid cursor: '{cursor}'")
+    return name, client_cursor, offset
+
+async def paginate(
+    client_names: list[str],
+    kind: CatalogKind,
+    cursor: str | None,
+    page_size: int,
+    accept: Callable[[str, CatalogItem], bool] | None = None,
+) -> tuple[list[tuple[str, CatalogItem]], str | None]:
+    """
+    Returns up to `page_size` items of the lists of the clients, in order, with the name of their client,
+    and the cursor of the next page. Client pages are only fetched once the client pages through them.
+    Items not accepted by `accept` are skipped and do not count toward the page size.
+    """
+    if len(client_names) == 0:
+        return [], None
+
+    name, client_cursor, offset = (client_names[0], None, 0) if cursor is None else decode_cursor(cursor)
+    if name not in client_names:
+        raise ValueError(f"Cursor of unavailable client '{name}', list again from the first page")
+    index = client_names.index(name)
+
+    client_manager = use_client_manager()
+    items = []
+    while True:
+        try:
+            page_items, next_cursor = await client_manager.list_page(name, kind, client_cursor)
+        except Exception as e:
+            logger.warning("Failed to list {} of client '{}', skipping it: {}", kind, name, e)
+            page_items, next_cursor = [], None
+
+        if len(items) == page_size:
+            # only hand out a cursor when items are left, so the last page is never empty
+            if any(accept is None or accept(name, item) for item in page_items[offset:]):
+                return items, encode_cursor((name, client_cursor, offset))
+            offset = len(page_items)
+        else:
+            taken = page_items[offset:offset + page_size - len(items)]
+            items.extend((name, item) for item in taken if accept is None or accept(name, item))
+            offset += len(taken)
+            if offset < len(page_items):
+                # the rest of the client page
+                continue
+
+        if next_cursor is not None:
+            client_cursor, offset = next_cursor, 0
+            continue
+        index += 1
+        if index == len(client_names):
+            return items, None
+        name, client_cursor, offset = client_names[index], None, 0
+
+async def paginate_catalog(
+    kind: CatalogKind,
+    cursor: str | None,
+    page_size: int,
+    accept: Callable[[str, CatalogItem], bool] | None = None,
+) -> tuple[list, str | None]:
+    """Pages through the lists of all clients, or of the client of the namespace, named like the full lists."""
+    namespace = use_namespace()
+    client_manager = use_client_manager()
+    if namespace is not None:
+        if client_manager.get_client(namespace) is None:
+            raise ValueError(f"No client found for name: '{namespace}'")
+        page, next_cursor = await paginate([namespace], kind, cursor, page_size, accept)
+        return [item for _, item in page], next_cursor
+
+    page, next_cursor = await paginate(client_manager.client_names, kind, cursor, page_size, accept)
+    if not use_settings().use_namespace:
+        return [item for _, item in page], next_cursor
+    # cached items are shared, never rename them in place
+    return [item.model_copy(update={"name": with_namespace(name, item.name)}) for name, item in page], next_cursor
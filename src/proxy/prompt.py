@@ -2,41 +2,47 @@ import asyncio
 from loguru import logger
 from mcp import types
 
+from ..log import log_request
+from ..metrics import PROXY_FANOUT_WIDTH, instrument
+from .fanout import first_success
+from .pagination import paginate_catalog
 from .utils import use_client_manager, use_client_session, use_namespace, use_settings, with_namespace, without_namespace
 
 
-async def handle_list_prompts() -> list[types.Prompt]:
-    logger.info("List prompts requested")
+@instrument("prompts/list")
+async def handle_list_prompts(cursor: str | None = None) -> tuple[list[types.Prompt], str | None]:
+    log_request("List prompts requested")
     namespace = use_namespace()
 
-    if namespace is not None:
-        client = use_client_session(namespace)
-        if client is None:
-            raise ValueError(f"No client found for name: '{namespace}'")
-        list_tools_result = await client.list_prompts()
-        return list_tools_result.prompts
-
     client_manager = use_client_manager()
     settings = use_settings()
-    tasks = map(lambda session: session.list_prompts(), client_manager.client_sessions)
+    if settings.list_page_size is not None:
+        return await paginate_catalog("prompts", cursor, settings.list_page_size)
+
+    if namespace is not None:
+        return await client_manager.list_prompts(namespace), None
+
+    client_names = list(client_manager.client_names)
+    PROXY_FANOUT_WIDTH.observe(len(client_names), "prompts/list")
+    tasks = map(client_manager.list_prompts, client_names)
     task_results = await asyncio.gather(*tasks, return_exceptions=True)
     
     result_prompts = []
-    for name, result in zip(client_manager.client_names, task_results):
+    for name, result in zip(client_names, task_results):
         if isinstance(result, BaseException):
             logger.warning("Unexpected result type from list_prompts for client: {}", result)
             continue
         if settings.use_namespace:
-            for prompt in result.prompts:
-                prompt.name = with_namespace(name, prompt.name)
-                result_prompts.append(prompt)
+            for prompt in result:
+                result_prompts.append(prompt.model_copy(update={"name": with_namespace(name, prompt.name)}))
         else:
-            result_prompts.extend(result.prompts)
+            result_prompts.extend(result)
 
-    return result_prompts
+    return result_prompts, None
 
+@instrument("prompts/get")
 async def handle_get_prompt(name: str, arguments: dict[str, str] | None) -> types.GetPromptResult:
-    logger.info("Get prompt: '{}'", name)
+    log_request("Get prompt: '{}'", name)
     namespace = use_namespace()
 
     if namespace is not None:
@@ -56,12 +62,12 @@ async def handle_get_prompt(name: str, arguments: dict[str, str] | None) -> type
         return get_prompt_result
 
     client_manager = use_client_manager()
-    tasks = map(lambda session: session.get_prompt(name, arguments), client_manager.client_sessions)
-    task_results = await asyncio.gather(*tasks, return_exceptions=True)
-    for result in task_results:
-        if isinstance(result, BaseException):
-            logger.warning("Unexpected exception from get_prompt for client: {}", result)
-            continue
+    calls = {client_name: client.get_prompt(name, arguments)
+             for client_name, client in client_manager.available_clients}
+    PROXY_FANOUT_WIDTH.observe(len(calls), "prompts/get")
+    found = await first_success(calls, timeout=settings.fanout_timeout)
+    if found is not None:
+        _, result = found
         return result
 
     logger.warning("Prompt not found: '{}'", name)
@@ -1,44 +1,50 @@
 import asyncio
-from asyncio import tasks
+import base64
 from loguru import logger
 from mcp import types
 from pydantic import AnyUrl
 
-from .utils import use_client_manager, use_client_session, use_namespace, use_settings, with_namespace
+from ..log import log_request
+from ..metrics import PROXY_FANOUT_WIDTH, instrument
+from .fanout import first_success
+from .pagination import paginate_catalog
+from .utils import use_client_manager, use_namespace, use_settings, use_subscriber, with_namespace
 
 
-async def handle_list_resources() -> list[types.Resource]:
-    logger.info("List resources requested")
+@instrument("resources/list")
+async def handle_list_resources(cursor: str | None = None) -> tuple[list[types.Resource], str | None]:
+    log_request("List resources requested")
     namespace = use_namespace()
 
-    if namespace is not None:
-        client = use_client_session(namespace)
-        if client is None:
-            raise ValueError(f"No client found for name: '{namespace}'")
-        list_resources_result = await client.list_resources()
-        return list_resources_result.resources
-
     client_manager = use_client_manager()
     settings = use_settings()
-    tasks = map(lambda session: session.list_resources(), client_manager.client_sessions)
+    if settings.list_page_size is not None:
+        return await paginate_catalog("resources", cursor, settings.list_page_size)
+
+    if namespace is not None:
+        return await client_manager.list_resources(namespace), None
+
+    client_names = list(client_manager.client_names)
+    PROXY_FANOUT_WIDTH.observe(len(client_names), "resources/list")
+    tasks = map(client_manager.list_resources, client_names)
     task_results = await asyncio.gather(*tasks, return_exceptions=True)
 
     result_resources = []
-    for name, task_result in zip(client_manager.client_names, task_results):
+    for name, task_result in zip(client_names, task_results):
         if isinstance(task_result, BaseException):
             logger.exception(f"Error while listing resources for server: {name}")
             continue
 
         if settings.use_namespace:
-            for resource in task_result.resources:
-                resource.name = with_namespace(name, resource.name)
-                result_resources.append(resource)
+            for resource in task_result:
+                result_resources.append(resource.model_copy(update={"name": with_namespace(name, resource.name)}))
         else:
-            result_resources.extend(task_result.resources)
+            result_resources.extend(task_result)
     
-    logger.debug("Returned resources: {}", result_resources)
-    return result_resources
+    logger.opt(lazy=True).debug("Returned resources: {}", lambda: result_resources)
+    return result_resources, None
 
+@instrument("resources/read")
 async def handle_read_resource(uri: AnyUrl) -> str | bytes:
     def join_contents(contents: list[types.TextResourceContents | types.BlobResourceContents]) -> str | bytes:
         if type(contents[0]) is types.TextResourceContents:
@@ -46,87 +52,102 @@ async def handle_read_resource(uri: AnyUrl) -> str | bytes:
             return "".join(content.text for content in contents) # type: ignore
         elif type(contents[0]) is types.BlobResourceContents:
             # assert all type(content in contents) is types.BlobResourceContents
-            return b"".join(content.blob for content in contents) # type: ignore
+            # blobs are base64 encoded on the wire
+            return b"".join(base64.b64decode(content.blob) for content in contents) # type: ignore
         else:
             raise ValueError("Unreachable")
 
-    logger.info(f"Read resource requested: {uri}")
+    log_request("Read resource requested: {}", uri)
     namespace = use_namespace()
 
+    client_manager = use_client_manager()
     if namespace is not None:
-        client = use_client_session(namespace)
-        if client is None:
-            raise ValueError(f"No client found for name: '{namespace}'")
-        read_resource_result = await client.read_resource(uri)
+        read_resource_result = await client_manager.read_resource(namespace, uri)
         return join_contents(read_resource_result.contents)
 
-    client_manager = use_client_manager()
-    tasks = map(lambda session: session.read_resource(uri), client_manager.client_sessions)
-    task_results = await asyncio.gather(*tasks, return_exceptions=True)
-    for task_result in task_results:
-        if isinstance(task_result, BaseException):
-            logger.exception(f"Error while reading resource: {task_result}")
-            continue
-        return join_contents(task_result.contents)
+    cached = client_manager.get_cached_resource(uri)
+    if cached is not None:
+        return join_contents(cached.contents)
+
+    owner = await client_manager.find_resource_owner(uri)
+    if owner is not None and owner in client_manager.client_names:
+        try:
+            read_resource_result = await client_manager.read_resource(owner, uri)
+            return join_contents(read_resource_result.contents)
+        except Exception as e:
+            logger.warning("Failed to read resource '{}' from its owner '{}': {}", uri, owner, e)
+            client_manager.forget_resource_owner(uri)
+
+    # not in any catalog, probe a few clients at a time
+    # without caching, which would subscribe upstream on clients which may not even serve the resource
+    settings = use_settings()
+    candidates = [name for name in client_manager.client_names if name != owner]
+    width = settings.resource_probe_width
+    for i in range(0, len(candidates), width):
+        batch = candidates[i:i + width]
+        calls = {name: client_manager.read_resource(name, uri, cache=False) for name in batch}
+        PROXY_FANOUT_WIDTH.observe(len(calls), "resources/read")
+        found = await first_success(calls, timeout=settings.fanout_timeout)
+        if found is not None:
+            name, read_resource_result = found
+            client_manager.learn_resource_owner(uri, name)
+            return join_contents(read_resource_result.contents)
 
     logger.warning("Resource not found: '{}'", uri)
-    raise ValueError("Resource not found: '{}'", uri)
+    raise ValueError(f"Resource not found: '{uri}'")
 
-async def handle_list_resource_templates() -> list[types.ResourceTemplate]:
-    logger.info("List resource templates requested")
+@instrument("resources/templates/list")
+async def handle_list_resource_templates(cursor: str | None = None) -> tuple[list[types.ResourceTemplate], str | None]:
+    log_request("List resource templates requested")
     namespace = use_namespace()
 
-    if namespace is not None:
-        client = use_client_session(namespace)
-        if client is None:
-            raise ValueError(f"No client found for name: '{namespace}'")
-        list_resource_templates_result = await client.list_resource_templates()
-        return list_resource_templates_result.resourceTemplates
-
     client_manager = use_client_manager()
     settings = use_settings()
-    tasks = map(lambda session: session.list_resource_templates(), client_manager.client_sessions)
+    if settings.list_page_size is not None:
+        return await paginate_catalog("resource_templates", cursor, settings.list_page_size)
+
+    if namespace is not None:
+        return await client_manager.list_resource_templates(namespace), None
+
+    client_names = list(client_manager.client_names)
+    PROXY_FANOUT_WIDTH.observe(len(client_names), "resources/templates/list")
+    tasks = map(client_manager.list_resource_templates, client_names)
     task_results = await asyncio.gather(*tasks, return_exceptions=True)
 
     templates = []
-    for name, task_result in zip(client_manager.client_names, task_results):
+    for name, task_result in zip(client_names, task_results):
         if isinstance(task_result, BaseException):
             logger.exception(f"Error while listing resource templates: {task_result}")
             continue
         if settings.use_namespace:
-            for template in task_result.resourceTemplates:
-                template.name = with_namespace(name, template.name)
-                templates.append(template)
+            for template in task_result:
+                templates.append(template.model_copy(update={"name": with_namespace(name, template.name)}))
         else:
-            templates.extend(task_result.resourceTemplates)
-    return templates
+            templates.extend(task_result)
+    return templates, None
 
+@instrument("resources/subscribe")
 async def handle_subscribe_resource(url: AnyUrl):
-    logger.info("Subscribe resource '{}' requested", url)
+    log_request("Subscribe resource '{}' requested", url)
     namespace = use_namespace()
 
+    client_manager = use_client_manager()
+    subscriber = use_subscriber()
     if namespace is not None:
-        client = use_client_session(namespace)
-        if client is None:
-            raise ValueError(f"No client found for name: '{namespace}'")
-        await client.subscribe_resource(url)
+        await client_manager.subscribe_resource(namespace, url, subscriber)
         return
 
-    client_manager = use_client_manager()
-    tasks = map(lambda session: session.subscribe_resource(url), client_manager.client_sessions)
+    owner = await client_manager.find_resource_owner(url)
+    if owner is not None and owner in client_manager.client_names:
+        client_names = [owner]
+    else:
+        # not in any catalog, subscribe wherever it may be served
+        client_names = client_manager.client_names
+    PROXY_FANOUT_WIDTH.observe(len(client_names), "resources/subscribe")
+    tasks = map(lambda name: client_manager.subscribe_resource(name, url, subscriber), client_names)
     await asyncio.gather(*tasks, return_exceptions=True)
 
+@instrument("resources/unsubscribe")
 async def handle_unsubscribe_resource(url: AnyUrl):
-    logger.info("Unsubscribe resource '{}' requested", url)
-    namespace = use_namespace()
-
-    if namespace is not None:
-        client = use_client_session(namespace)
-        if client is None:
-            raise ValueError(f"No client found for name: '{namespace}'")
-        await client.unsubscribe_resource(url)
-        return
-
-    client_manager = use_client_manager()
-    tasks = map(lambda session: session.unsubscribe_resource(url), client_manager.client_sessions)
-    await asyncio.gather(*tasks, return_exceptions=True)
+    log_request("Unsubscribe resource '{}' requested", url)
+    use_client_manager().unsubscribe_resource(use_namespace(), url, use_subscriber())
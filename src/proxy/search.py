@@ -0,0 +1,61 @@
+import json
+from typing import Any
+
+from mcp import types
+
+from ..log import log_request
+from ..metrics import instrument
+from .utils import is_tool_allowed, use_client_manager, use_namespace, use_settings, with_namespace
+
+
+SEARCH_TOOLS = "search_tools"
+
+SEARCH_TOOLS_TOOL = types.Tool(
+    name=SEARCH_TOOLS,
+    description=(
+        "Finds the tools matching keywords of their names, descriptions or servers, "
+        "to call the tools relevant to a task without listing all of them. "
+        "Returns a JSON array of the matching tools, best first, with their `name`, "
+        "`description` and `inputSchema`; call them by their `name`."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "Keywords describing the tools to find"},
+            "limit": {"type": "integer", "minimum": 1, "description": "Maximum number of tools returned"},
+        },
+        "required": ["query"],
+    },
+)
+
+def parse_search(arguments: dict[str, Any] | None, default_limit: int) -> tuple[str, int]:
+    arguments = arguments or {}
+    query = arguments.get("query")
+    if not isinstance(query, str):
+        raise ValueError("'query' must be a string")
+    limit = arguments.get("limit", default_limit)
+    if type(limit) is not int or limit < 1:
+        raise ValueError("'limit' must be a positive integer")
+    return query, limit
+
+@instrument("tools/call")
+async def handle_search_tools(arguments: dict[str, Any] | None) -> list[types.TextContent]:
+    """
+    Returns the allowed tools of the endpoint matching `arguments["query"]`, named as in its tools/list,
+    as a JSON array in a single text content.
+    """
+    settings = use_settings()
+    query, limit = parse_search(arguments, settings.search_tools_limit)
+    log_request("Handling search of tools for '{}'", query)
+    namespace = use_namespace()
+
+    def accept(client_name: str, tool: types.Tool) -> bool:
+        return (namespace is None or client_name == namespace) and is_tool_allowed(client_name, tool.name)
+
+    found = await use_client_manager().search_tools(query, limit, accept)
+    tools = [{
+        "name": with_namespace(client_name, tool.name) if namespace is None and settings.use_namespace else tool.name,
+        "description": tool.description,
+        "inputSchema": tool.inputSchema,
+    } for client_name, tool in found]
+    return [types.TextContent(type="text", text=json.dumps(tools, ensure_ascii=False))]
@@ -0,0 +1,51 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Hashable
+
+from loguru import logger
+from mcp import ServerSession
+from mcp.server import Server
+from pydantic import AnyUrl
+
+from .. import context
+
+
+class Subscriber:
+    """
+    A frontend session as the holder of its resource subscriptions in the client manager,
+    it lives as long as the session and its subscriptions are released along with it.
+    """
+
+    def __init__(self):
+        # known once the session sends its first subscription
+        self.session: ServerSession | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def notify_updated(self, uri: str):
+        if self.session is None:
+            return
+        task = asyncio.create_task(self._send_updated(self.session, uri))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send_updated(self, session: ServerSession, uri: str):
+        try:
+            await session.send_resource_updated(AnyUrl(uri))
+        except Exception as e:
+            # the session is gone, its subscriptions are released by the end of its lifespan
+            logger.debug("Failed to send resource updated notification: {}", repr(e))
+
+@asynccontextmanager
+async def subscriber_lifespan(_: Server) -> AsyncIterator[Subscriber]:
+    """The lifespan of the proxy server, which the SDK enters and exits around every frontend session."""
+    subscriber = Subscriber()
+    try:
+        yield subscriber
+    finally:
+        context.get_client_manager().release_subscriptions(subscriber)
+
+def notify_subscribers(uri: str, holders: list[Hashable]):
+    """Forwards a `notifications/resources/updated` of a client to the frontend sessions subscribed to the resource."""
+    for holder in holders:
+        if isinstance(holder, Subscriber):
+            holder.notify_updated(uri)
@@ -1,78 +1,78 @@
 import asyncio
+from typing import Any
 from loguru import logger
 from mcp import types
 
-from .utils import use_client_manager, use_client_session, use_namespace, use_settings, with_namespace, without_namespace
+from ..log import log_request
+from ..metrics import PROXY_FANOUT_WIDTH, instrument
+from .pagination import paginate_catalog
+from .utils import is_tool_allowed, use_caller, use_client_manager, use_namespace, use_settings, with_namespace, without_namespace
 
 
-async def handle_list_tools() -> list[types.Tool]:
-    logger.info("Handling list tools request")
+@instrument("tools/list")
+async def handle_list_tools(cursor: str | None = None) -> tuple[list[types.Tool], str | None]:
+    log_request("Handling list tools request")
     namespace = use_namespace()
 
-    if namespace is not None:
-        client = use_client_session(namespace)
-        if client is None:
-            raise ValueError(f"No client found for name: '{namespace}'")
-        list_tools_result = await client.list_tools()
-        return list_tools_result.tools
-
     client_manager = use_client_manager()
     settings = use_settings()
-    tasks = map(lambda client: client.list_tools(), client_manager.client_sessions)
+    accept = None if settings.tools_allow_list is None else lambda name, tool: is_tool_allowed(name, tool.name)
+    if settings.list_page_size is not None:
+        return await paginate_catalog("tools", cursor, settings.list_page_size, accept)
+
+    if namespace is not None:
+        tools = await client_manager.list_tools(namespace)
+        return [tool for tool in tools if is_tool_allowed(namespace, tool.name)], None
+
+    client_names = list(client_manager.client_names)
+    PROXY_FANOUT_WIDTH.observe(len(client_names), "tools/list")
+    tasks = map(client_manager.list_tools, client_names)
     task_results = await asyncio.gather(*tasks, return_exceptions=True)
     
     result_tools = []
-    for name, result in zip(client_manager.client_names, task_results):
+    for name, result in zip(client_names, task_results):
         if isinstance(result, BaseException):
-            logger.warning("Unexpected result from list_prompts for server: {}", name)
+            logger.warning("Unexpected result from list_tools for server: {}", name)
             continue
+        if accept is not None:
+            result = [tool for tool in result if accept(name, tool)]
         if settings.use_namespace:
-            for tool in result.tools:
-                tool.name = with_namespace(name, tool.name)
-                result_tools.append(tool)
+            for tool in result:
+                # cached items are shared, never rename them in place
+                result_tools.append(tool.model_copy(update={"name": with_namespace(name, tool.name)}))
         else:
-            result_tools.extend(result.tools)
+            result_tools.extend(result)
 
-    return result_tools
+    return result_tools, None
 
+@instrument("tools/call")
 async def handle_call_tool(
     name: str,
     arguments: dict[str, str] | None,
 ) -> list[types.TextContent | types.ImageContent | types.EmbeddedResource]:
-    logger.info("Handling call tool request for tool '{}'", name)
-    namespace = use_namespace()
-
-    if namespace is not None:
-        client = use_client_session(namespace)
-        if client is None:
-            raise ValueError(f"No client found for name: '{namespace}'")
-        call_tool_result = await client.call_tool(name, arguments)
-        return call_tool_result.content
+    log_request("Handling call tool request for tool '{}'", name)
+    call_tool_result = await call_tool(name, arguments)
+    return call_tool_result.content
 
-    settings = use_settings()
-    if settings.use_namespace:
-        namespace, tool_name = without_namespace(name)
-        client = use_client_session(namespace)
-        if client is None:
-            raise ValueError(f"No client found for name: '{namespace}'")
-        call_tool_result = await client.call_tool(tool_name, arguments)
-        return call_tool_result.content
+async def call_tool(name: str, arguments: dict[str, Any] | None) -> types.CallToolResult:
+    """Calls the tool named as in the tools/list response of the endpoint."""
+    namespace = use_namespace()
 
     client_manager = use_client_manager()
-    tasks = map(lambda client: client.list_tools(), client_manager.client_sessions)
-    task_results = await asyncio.gather(*tasks, return_exceptions=True)
-    for client_name, result in zip(client_manager.client_names, task_results):
-        if isinstance(result, BaseException): continue
-        # try to find the tool in the result
-        filtered = filter(lambda tool: tool.name == name, result.tools)
-        optional_tool = next(filtered, None)
-        if optional_tool is None: continue
-
-        # if found, call it on the corresponding client
-        target_client = client_manager.get_client(client_name)
-        assert target_client is not None # since the name is from the list of client_names, it should not be None
-        call_tool_result = await target_client.call_tool(name, arguments)
-        return call_tool_result.content
+    settings = use_settings()
+    if namespace is not None:
+        client_name, tool_name = namespace, name
+    elif settings.use_namespace:
+        client_name, tool_name = without_namespace(name)
+    else:
+        owner = await client_manager.find_tool_owner(name)
+        if owner is None:
+            logger.warning("No tool named '{}' found", name)
+            raise ValueError(f"No tool named '{name}' found")
+        # the index is built from the list of client_names, the client should be found
+        client_name, tool_name = owner, name
 
-    logger.warning("No tool named '{}' found", name)
-    raise ValueError(f"No tool named '{name}' found")
+    if not is_tool_allowed(client_name, tool_name):
+        logger.warning("Tool '{}' is not in the allow list", name)
+        raise ValueError(f"No tool named '{name}' found")
+    return await client_manager.call_tool(client_name, tool_name, arguments, caller=use_caller())
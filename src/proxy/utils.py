@@ -1,35 +1,52 @@
-from mcp import ClientSession
-from starlette_context import context
+from fnmatch import fnmatchcase
+from typing import Hashable
 
+from mcp.server.lowlevel.server import request_ctx
+
+from .. import context
 from ..client.client_manager import ClientManager
+from ..client.session_pool import SessionPool
 from ..settings import Settings
+from .subscriptions import Subscriber
 
 
 ### Hooks
 
-def use_client_session(name: str) -> ClientSession | None:
+def use_client_session(name: str) -> SessionPool | None:
     client_manager = use_client_manager()
     return client_manager.get_client(name)
 
-def use_client_manager():
-    client_manager = context.get("client_manager")
-    assert type(client_manager) is ClientManager
-    return client_manager
+def use_client_manager() -> ClientManager:
+    return context.get_client_manager()
 
 def use_namespace() -> str | None:
-    namespace = context.get("namespace")
-    return namespace
+    return context.namespace.get()
 
 def use_settings() -> Settings:
-    settings = context.get("settings")
-    assert type(settings) is Settings
-    return settings
+    return context.get_settings()
+
+def use_caller() -> Hashable:
+    """Identifies the frontend client of the request being handled, by its session or else its address."""
+    return context.caller.get() or request_ctx.get().session
+
+def use_subscriber() -> Subscriber:
+    """The holder of the resource subscriptions of the frontend session of the request being handled."""
+    ctx = request_ctx.get()
+    subscriber: Subscriber = ctx.lifespan_context
+    subscriber.session = ctx.session
+    return subscriber
 
 ### Tool functions
 
 def with_namespace(namespace: str, name: str) -> str:
     return f"{namespace}::{name}"
 
+def is_tool_allowed(client_name: str, tool_name: str) -> bool:
+    allow_list = use_settings().tools_allow_list
+    if allow_list is None:
+        return True
+    return any(fnmatchcase(with_namespace(client_name, tool_name), pattern) for pattern in allow_list)
+
 def without_namespace(namespaced: str) -> tuple[str, str]:
     namespace, name = namespaced.split("::")
     return namespace, name
@@ -0,0 +1,82 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from loguru import logger
+from mcp.server.lowlevel.server import Server
+from mcp.server.streamable_http import MCP_SESSION_ID_HEADER, EventStore
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.datastructures import Headers
+from starlette.types import Receive, Scope, Send
+
+
+class SessionManager(StreamableHTTPSessionManager):
+    """
+    Streamable HTTP session manager which, in stateful mode, closes the sessions
+    without any request for `idle_timeout` seconds and forgets the terminated ones,
+    the SDK keeps both until shutdown.
+    """
+
+    def __init__(
+        self,
+        app: Server,
+        event_store: EventStore | None,
+        stateless: bool,
+        idle_timeout: float | None,
+    ):
+        super().__init__(app=app, event_store=event_store, stateless=stateless)
+        self._idle_timeout = idle_timeout
+        self._last_active: dict[str, float] = {}
+        # a session with a request in flight, e.g. an open GET stream, is never idle
+        self._active_requests: dict[str, int] = {}
+
+    @asynccontextmanager
+    async def run(self) -> AsyncIterator[None]:
+        async with super().run():
+            if self.stateless or self._idle_timeout is None:
+                yield
+                return
+            expiry = asyncio.create_task(self._expire_idle_sessions(self._idle_timeout))
+            try:
+                yield
+            finally:
+                expiry.cancel()
+
+    async def handle_request(self, scope: Scope, receive: Receive, send: Send) -> None:
+        session_id = Headers(scope=scope).get(MCP_SESSION_ID_HEADER)
+        if self.stateless or session_id is None:
+            await super().handle_request(scope, receive, send)
+            return
+
+        self._active_requests[session_id] = self._active_requests.get(session_id, 0) + 1
+        try:
+            await super().handle_request(scope, receive, send)
+        finally:
+            self._active_requests[session_id] -= 1
+            self._last_active[session_id] = time.monotonic()
+
+    async def _expire_idle_sessions(self, idle_timeout: float):
+        while True:
+            await asyncio.sleep(min(idle_timeout / 2, 60))
+            now = time.monotonic()
+            for session_id, transport in list(self._server_instances.items()):
+                if self._active_requests.get(session_id, 0) > 0:
+                    continue
+                # sessions are only seen here before their second request
+                last_active = self._last_active.setdefault(session_id, now)
+                terminated = transport._terminated
+                if not terminated and now - last_active < idle_timeout:
+                    continue
+
+                del self._server_instances[session_id]
+                if not terminated:
+                    logger.info("Closing streamable HTTP session '{}' idle for {:.0f} seconds.",
+                                session_id, now - last_active)
+                    await transport._terminate_session()
+
+            # also drops the activity of requests with unknown session ids
+            for session_id in list(self._last_active):
+                if session_id not in self._server_instances and self._active_requests.get(session_id, 0) == 0:
+                    del self._last_active[session_id]
+                    self._active_requests.pop(session_id, None)
@@ -1,10 +1,15 @@
 from typing import Literal
+from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 DEFAULT_CONFIG_FILE = "./examples/config/mcp.json"
 DEFAULT_ENCODING = "utf-8"
+DEFAULT_RESOURCE_CACHE_SIZE = 64 * 1024 * 1024
+DEFAULT_TOOL_CACHE_SIZE = 16 * 1024 * 1024
 TRANSPORT_MODES = Literal["stdio", "sse", "http"]
+EVENT_STORES = Literal["memory", "sqlite"]
+LOG_LEVELS = Literal["TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL"]
 
 class Settings(BaseSettings):
     config: str = DEFAULT_CONFIG_FILE
@@ -12,5 +17,75 @@ class Settings(BaseSettings):
     transport: TRANSPORT_MODES = "sse"
     use_namespace: bool = True
     debug: bool = False
+    # seconds before a cached backend catalog is refetched, `None` relies on list_changed only
+    catalog_ttl: float | None = None
+    # seconds a client may take to connect and initialize, can be overridden per server
+    connect_timeout: float = 30
+    # seconds a client may take to answer a request, can be overridden per server and method, `None` waits forever
+    request_timeout: float | None = None
+    # seconds to wait for all clients before serving, `None` waits for every client
+    startup_timeout: float | None = 10
+    # seconds between pings of every client session, `None` only pings when a circuit opens
+    health_check_interval: float | None = 30
+    health_check_timeout: float = 10
+    # seconds before reconnecting a failed client, doubled after every failed attempt
+    reconnect_initial_backoff: float = 1
+    reconnect_max_backoff: float = 60
+    # consecutive failures after which a client is skipped by fan-out requests
+    circuit_failure_threshold: int = 3
+    circuit_recovery_timeout: float = 30
+    # total size in bytes of the resource contents cached for the servers with `cache_resources`
+    resource_cache_size: int = DEFAULT_RESOURCE_CACHE_SIZE
+    # total size in bytes of the tool results cached for the tools listed in `cache_tools`
+    tool_cache_size: int = DEFAULT_TOOL_CACHE_SIZE
+    # connections of the HTTP pool shared by the sse and streamable HTTP servers, in total and kept idle
+    http_max_connections: int = Field(default=100, ge=1)
+    http_max_keepalive_connections: int = Field(default=20, ge=0)
+    # seconds an idle pooled connection is kept open, `None` keeps it until the server closes it
+    http_keepalive_expiry: float | None = 5
+    # talk HTTP/2 to the servers which support it, can be overridden per server
+    http2: bool = False
+    # seconds to connect and send an HTTP request, and to wait for the next bytes of a response or event stream
+    http_timeout: float = 30
+    http_read_timeout: float = 60 * 5
+    # number of clients probed at once for resources not found in their catalogs
+    resource_probe_width: int = 4
+    # expose the built-in `batch_call` tool, which calls several tools in one request
+    batch_call: bool = False
+    # number of tools a `batch_call` calls at once
+    batch_call_concurrency: int = Field(default=8, ge=1)
+    # expose the built-in `search_tools` tool, which finds the tools matching keywords
+    search_tools: bool = False
+    # number of tools returned by `search_tools` when its caller sets no limit
+    search_tools_limit: int = Field(default=10, ge=1)
+    # only list the built-in tools, the other tools are found with `search_tools`
+    search_tools_only: bool = False
+    # glob patterns of the `client::tool` names exposed on every endpoint, `None` exposes all tools
+    tools_allow_list: list[str] | None = None
+    # seconds to wait for the first matching answer of a request sent to all clients
+    fanout_timeout: float | None = None
+    # number of items per page of the list requests, `None` returns the complete lists at once
+    list_page_size: int | None = Field(default=None, ge=1)
+    # create a fresh session for every streamable HTTP request, `False` keeps sessions between requests
+    stateless_http: bool = True
+    # where the events of stateful sessions are kept for clients resuming a stream, `None` disables resuming
+    event_store: EVENT_STORES | None = "memory"
+    event_store_size: int = Field(default=10000, ge=1)
+    event_store_path: str = "./events.sqlite3"
+    # seconds without requests after which a stateful session is closed, `None` keeps them until shutdown
+    session_idle_timeout: float | None = 1800
+    # seconds between checks of the config file for changes, `None` only reloads on SIGHUP or `POST /admin/reload`
+    config_watch_interval: float | None = None
+    # seconds a removed or changed client may take to finish its requests in flight before it is stopped
+    drain_timeout: float = 30
+    # Unix socket of the supervisor running the client sessions for all the workers, `None` runs them in every worker
+    supervisor_socket: str | None = None
+    # minimum level of the logs, `debug` lowers it to DEBUG
+    log_level: LOG_LEVELS = "INFO"
+    # write the logs from a background thread instead of the event loop
+    log_enqueue: bool = True
+    # share of the requests whose per-request INFO logs are written
+    log_sample_rate: float = Field(default=1.0, ge=0, le=1)
 
-    model_config = SettingsConfigDict()
+    # `null` sets the settings defaulting to a value to `None`, e.g. `STARTUP_TIMEOUT=null`
+    model_config = SettingsConfigDict(env_parse_none_str="null")
@@ -0,0 +1,52 @@
+"""
+Runs the client sessions once for all the workers of the proxy, which reach them over a Unix socket:
+
+    SUPERVISOR_SOCKET=/tmp/multi-mcp.sock python -m src.supervisor
+    SUPERVISOR_SOCKET=/tmp/multi-mcp.sock hypercorn src.main:app --workers 8
+
+The supervisor serves every client at `/{name}/mcp` of the socket, with stateful sessions
+so the workers are notified when the catalogs of the clients change.
+"""
+
+import asyncio
+
+from dotenv import load_dotenv
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+from loguru import logger
+
+from .entry_server import EntryServer
+from .log import setup_logging
+from .settings import Settings
+
+
+async def run_supervisor(settings: Settings):
+    socket = settings.supervisor_socket
+    if socket is None:
+        raise ValueError("SUPERVISOR_SOCKET must be set to run the supervisor")
+
+    server = EntryServer(settings.model_copy(update={
+        "transport": "http",
+        # the supervisor itself runs the clients from the config
+        "supervisor_socket": None,
+        "stateless_http": False,
+        # the workers reconnect on their own, the events of their streams are not replayed
+        "event_store": None,
+        "session_idle_timeout": None,
+        # the built-in tools are the workers' own, they are not tools of the backends
+        "batch_call": False,
+        "search_tools": False,
+        "search_tools_only": False,
+    }))
+    server.start_streamable_server()
+
+    config = Config()
+    config.bind = [f"unix:{socket}"]
+    logger.info("Starting supervisor on '{}'", socket)
+    await serve(server.app, config) # type: ignore
+
+if __name__ == "__main__":
+    load_dotenv(override=True)
+    settings = Settings()
+    setup_logging(settings)
+    asyncio.run(run_supervisor(settings))
@@ -0,0 +1,27 @@
+from dataclasses import replace
+
+from src.client.client_config import ClientConfig
+from src.client.client_manager import ClientManager
+from src.settings import Settings
+
+
+def test_available_clients_pairs_names_and_pools():
+    class FlippingPool:
+        """A pool whose circuit opens and closes between checks."""
+
+        def __init__(self):
+            self.checks = 0
+
+        @property
+        def available(self) -> bool:
+            self.checks += 1
+            return self.checks % 2 == 1
+
+    config = ClientConfig(name="a", params=ClientConfig.SseParams("http://localhost", {}), disabled=False)
+    manager = ClientManager(Settings(), [config, replace(config, name="b")])
+    pools = {"a": FlippingPool(), "b": FlippingPool()}
+    manager._clients.update(pools)
+
+    pools["a"].checks = 1
+    assert manager.available_clients == [("b", pools["b"])]
+    assert manager.available_clients == [("a", pools["a"])]
@@ -0,0 +1,26 @@
+import asyncio
+
+from src.proxy.fanout import first_success
+
+
+def test_losers_are_finished_on_return():
+    async def scenario():
+        started = asyncio.Event()
+
+        async def win():
+            await started.wait()
+            return "won"
+
+        async def fail():
+            started.set()
+            raise RuntimeError("failed")
+
+        async def hang():
+            await asyncio.Event().wait()
+
+        calls = {"a": fail(), "b": win(), "c": hang()}
+        found = await first_success(calls)
+        assert found == ("b", "won")
+        assert all(task.done() for task in asyncio.all_tasks() if task is not asyncio.current_task())
+    asyncio.run(scenario())
+
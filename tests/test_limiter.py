@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import pytest
+from mcp import McpError
+
+from src.client.circuit_breaker import CircuitBreaker
+from src.client.limiter import FairLimiter
+from src.client.session_pool import SessionPool
+
+
+def test_waiter_cancelled_in_the_tick_its_slot_is_released():
+    async def scenario():
+        limiter = FairLimiter("test", max_concurrency=1, queue_depth=10)
+        holding = asyncio.Event()
+        release = asyncio.Event()
+
+        async def hold():
+            async with limiter.slot("a"):
+                holding.set()
+                await release.wait()
+
+        async def wait_for_slot():
+            async with limiter.slot("b"):
+                pass
+
+        holder = asyncio.create_task(hold())
+        await holding.wait()
+        waiter = asyncio.create_task(wait_for_slot())
+        await asyncio.sleep(0)
+
+        # the waiter is cancelled and the slot released before either task runs again
+        release.set()
+        waiter.cancel()
+        results = await asyncio.gather(holder, waiter, return_exceptions=True)
+        assert results[0] is None
+        assert isinstance(results[1], asyncio.CancelledError)
+
+        # the slot is free again
+        async with asyncio.timeout(1):
+            async with limiter.slot("c"):
+                pass
+    asyncio.run(scenario())
+
+
+def test_wait_for_a_slot_is_bounded_by_the_request_timeout():
+    async def scenario():
+        limiter = FairLimiter("test", max_concurrency=1, queue_depth=10)
+        pool = SessionPool("test", CircuitBreaker("test", 5, 30), limiter, request_timeout=0.1)
+
+        async with limiter.slot("a"):
+            with pytest.raises(McpError) as error:
+                async with asyncio.timeout(1):
+                    await pool.call_tool("wait", caller="b")
+        assert error.value.error.code == httpx.codes.REQUEST_TIMEOUT
+
+        # the timed out call left the queue
+        async with asyncio.timeout(1):
+            async with limiter.slot("c"):
+                pass
+    asyncio.run(scenario())
@@ -0,0 +1,22 @@
+from loguru import logger
+
+from src import log
+
+
+def test_logs_of_a_request_are_sampled_together(monkeypatch):
+    monkeypatch.setattr(log, "_sample_rate", 0.5)
+    lines: list[str] = []
+    sink = logger.add(lambda message: lines.append(message.record["message"]), level="INFO")
+    try:
+        kept = 0
+        for i in range(100):
+            with log.sample_request():
+                log.log_request("start {}", i)
+                log.log_request("end {}", i)
+            logged = [line for line in lines if line.endswith(f" {i}")]
+            assert logged in ([], [f"start {i}", f"end {i}"])
+            kept += len(logged) > 0
+    finally:
+        logger.remove(sink)
+    # neither all nor none of the requests
+    assert 0 < kept < 100
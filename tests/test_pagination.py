@@ -0,0 +1,44 @@
+import asyncio
+
+from mcp import types
+
+from src.proxy import pagination
+
+
+class PagedClients:
+    """A client manager listing the tools of each client in pages of `page_size`."""
+
+    def __init__(self, tools: dict[str, list[str]], page_size: int):
+        self._tools = tools
+        self._page_size = page_size
+
+    async def list_page(self, name: str, kind: str, cursor: str | None):
+        start = 0 if cursor is None else int(cursor)
+        end = start + self._page_size
+        tools = [types.Tool(name=tool, inputSchema={}) for tool in self._tools[name][start:end]]
+        return tools, (str(end) if end < len(self._tools[name]) else None)
+
+
+def list_all(monkeypatch, tools: dict[str, list[str]], page_size: int, accept=None) -> list[list[str]]:
+    monkeypatch.setattr(pagination, "use_client_manager", lambda: PagedClients(tools, 2))
+
+    async def scenario():
+        pages = []
+        cursor = None
+        while True:
+            page, cursor = await pagination.paginate(list(tools), "tools", cursor, page_size, accept)
+            pages.append([item.name for _, item in page])
+            if cursor is None:
+                return pages
+    return asyncio.run(scenario())
+
+
+def test_full_last_page_has_no_cursor(monkeypatch):
+    pages = list_all(monkeypatch, {"a": ["a1", "a2"], "b": ["b1", "b2"]}, page_size=2)
+    assert pages == [["a1", "a2"], ["b1", "b2"]]
+
+
+def test_no_cursor_when_only_rejected_items_are_left(monkeypatch):
+    pages = list_all(monkeypatch, {"a": ["a1", "a2"], "b": ["b1", "b2", "b3"]}, page_size=2,
+                     accept=lambda name, item: name == "a")
+    assert pages == [["a1", "a2"]]
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from pydantic import AnyUrl
+
+from src.client.client_config import ClientConfig
+from src.client.client_manager import ClientManager
+from src.settings import Settings
+
+
+class FailingPool:
+    """A pool whose subscriptions succeed and whose reads fail."""
+
+    def __init__(self):
+        self.subscribed: list[AnyUrl] = []
+        self.unsubscribed: list[AnyUrl] = []
+
+    async def subscribe_resource(self, uri: AnyUrl):
+        self.subscribed.append(uri)
+
+    async def unsubscribe_resource(self, uri: AnyUrl):
+        self.unsubscribed.append(uri)
+
+    async def read_resource(self, uri: AnyUrl):
+        raise RuntimeError("read failed")
+
+
+def test_failed_read_releases_the_cache_subscription():
+    async def scenario():
+        config = ClientConfig(name="a", params=ClientConfig.SseParams("http://localhost", {}),
+                              disabled=False, cache_resources=True)
+        manager = ClientManager(Settings(), [config])
+        pool = manager._clients["a"] = FailingPool()
+
+        uri = AnyUrl("file:///a.txt")
+        with pytest.raises(RuntimeError):
+            await manager.read_resource("a", uri)
+        await asyncio.sleep(0)
+
+        assert manager._subscriptions == {}
+        assert pool.subscribed == [uri]
+        assert pool.unsubscribed == [uri]
+    asyncio.run(scenario())
@@ -0,0 +1,70 @@
+import asyncio
+
+from pydantic import AnyUrl
+
+from src.client.client_config import ClientConfig
+from src.client.client_manager import ClientManager
+from src.settings import Settings
+
+
+class SubscribingPool:
+    """A pool recording its upstream subscriptions, which are made once `ready` is set."""
+
+    def __init__(self):
+        self.ready = asyncio.Event()
+        self.subscribed: list[AnyUrl] = []
+        self.unsubscribed: list[AnyUrl] = []
+
+    async def subscribe_resource(self, uri: AnyUrl):
+        await self.ready.wait()
+        self.subscribed.append(uri)
+
+    async def unsubscribe_resource(self, uri: AnyUrl):
+        self.unsubscribed.append(uri)
+
+
+def make_manager() -> tuple[ClientManager, SubscribingPool]:
+    config = ClientConfig(name="a", params=ClientConfig.SseParams("http://localhost", {}), disabled=False)
+    manager = ClientManager(Settings(), [config])
+    pool = manager._clients["a"] = SubscribingPool()
+    return manager, pool
+
+
+def test_holders_share_one_upstream_subscription():
+    async def scenario():
+        manager, pool = make_manager()
+        pool.ready.set()
+        uri = AnyUrl("file:///a.txt")
+
+        await asyncio.gather(manager.subscribe_resource("a", uri, "x"), manager.subscribe_resource("a", uri, "y"))
+        assert pool.subscribed == [uri]
+
+        manager.unsubscribe_resource("a", uri, "x")
+        await asyncio.sleep(0)
+        assert pool.unsubscribed == []
+
+        manager.unsubscribe_resource("a", uri, "y")
+        await asyncio.sleep(0)
+        assert pool.unsubscribed == [uri]
+        assert manager._subscriptions == {}
+    asyncio.run(scenario())
+
+
+def test_cancelled_subscriber_releases_its_subscription():
+    async def scenario():
+        manager, pool = make_manager()
+        uri = AnyUrl("file:///a.txt")
+
+        subscribing = asyncio.create_task(manager.subscribe_resource("a", uri, "x"))
+        await asyncio.sleep(0)
+        subscribing.cancel()
+        await asyncio.gather(subscribing, return_exceptions=True)
+        assert manager._subscriptions == {}
+
+        # the upstream subscription is released once made
+        pool.ready.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        assert pool.subscribed == [uri]
+        assert pool.unsubscribed == [uri]
+    asyncio.run(scenario())